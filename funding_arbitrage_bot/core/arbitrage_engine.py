@@ -456,6 +456,10 @@ class ArbitrageEngine:
                 print("停止显示...", file=sys.__stdout__)
                 self.display_manager.stop()
                 print("显示已停止", file=sys.__stdout__)
+            
+            # 发送剩余的通知
+            if self.alerter:
+                await self.alerter.close()
 
     def _analyze_orderbook(self, orderbook, side, amount_usd, price):
         """
@@ -1576,7 +1580,7 @@ class ArbitrageEngine:
                     
                 # 发送通知
                 if self.alerter:
-                    self.alerter.send_order_notification(
+                    await self.alerter.send_order_notification_async(
                         symbol=symbol,
                         action="开仓",
                         quantity=bp_size,
@@ -1893,7 +1897,7 @@ class ArbitrageEngine:
                 
                 # 发送通知
                 if self.alerter:
-                    self.alerter.send_order_notification(
+                    await self.alerter.send_order_notification_async(
                         symbol=symbol,
                         action="平仓",
                         quantity=bp_size,
@@ -72,6 +72,7 @@ class DataManager:
         
         # 初始化数据存储
         self.latest_data = {}
+        self.hl_price_seqs = {}  # 币种 -> 上次处理的Hyperliquid价格更新序号
         self._init_data_structure()
         
         # 资金费率更新任务
@@ -316,7 +317,13 @@ class DataManager:
                 # 尝试从Hyperliquid获取价格
                 if self.hyperliquid_api:
                     try:
-                        price = await self.hyperliquid_api.get_price(symbol)
+                        # 自上次检查以来没有新的WebSocket报价时跳过，避免重复处理
+                        price_seq = self.hyperliquid_api.get_price_seq(symbol)
+                        if price_seq and price_seq == self.hl_price_seqs.get(symbol):
+                            price = None
+                        else:
+                            self.hl_price_seqs[symbol] = price_seq
+                            price = await self.hyperliquid_api.get_price(symbol)
                         # 更新价格
                         if price is not None:
                             # 检查是否有显著变化
@@ -9,8 +9,10 @@ Hyperliquid交易所API封装
 
 import json
 import time
+import array
 import asyncio
 import math
+import concurrent.futures
 from typing import Dict, List, Optional, Any, Tuple, Union
 from decimal import Decimal
 import logging
@@ -18,6 +20,7 @@ import traceback
 
 import websockets
 import httpx
+import orjson
 from hyperliquid.info import Info
 from hyperliquid.utils import constants
 from hyperliquid.exchange import Exchange
@@ -25,6 +28,9 @@ from eth_account import Account
 from hyperliquid.utils.signing import OrderType
 from hyperliquid.utils.types import Side
 
+# 预序列化JSON载荷时使用的请求头
+JSON_HEADERS = {"content-type": "application/json"}
+
 
 class HyperliquidAPI:
     """Hyperliquid交易所API封装类"""
@@ -93,11 +99,23 @@ class HyperliquidAPI:
         self.funding_cache = {}
         self.prices = {}  # 币种 -> 价格
         self.orderbooks = {}  # 币种 -> 订单深度数据
+        self._price_seq = {}  # 币种 -> 价格更新序号，供消费方判断是否有新数据
+        self._latest_levels = {}  # 币种 -> 最近一条WebSocket深度数据，等待定时发布
+        self._first_price_events = {}  # 币种 -> 等待首个WebSocket报价的事件
+        self.book_publish_interval = 0.05  # 订单深度发布间隔（秒）
+        self.book_publish_task = None
         
-        # 初始化HTTP客户端
-        self.http_client = httpx.AsyncClient(timeout=10.0)
+        # 初始化HTTP客户端，启用HTTP/2和长连接以复用TLS握手
+        self.http_client = httpx.AsyncClient(
+            timeout=10.0,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=300)
+        )
         self.base_url = "https://api.hyperliquid.xyz"
         
+        # SDK同步调用专用线程池，避免与其他run_in_executor调用争用默认线程池
+        self._sdk_pool = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="hl-sdk")
+        
         # 初始化SDK客户端
         self._initialize_hyperliquid_client()
         
@@ -131,6 +149,24 @@ class HyperliquidAPI:
         except Exception as e:
             self.logger.error(f"初始化Hyperliquid SDK失败: {str(e)}")
             
+    async def _post_info(self, payload: Dict[str, Any]) -> httpx.Response:
+        """
+        向/info端点发送POST请求
+        
+        载荷使用orjson预先序列化，绕过httpx内置的json编码
+        
+        Args:
+            payload: 请求载荷
+            
+        Returns:
+            HTTP响应
+        """
+        return await self.http_client.post(
+            f"{self.base_url}/info",
+            content=orjson.dumps(payload),
+            headers=JSON_HEADERS
+        )
+        
     async def start_websocket(self):
         """启动WebSocket连接以获取价格数据"""
         if self.ws_connected:
@@ -177,7 +213,7 @@ class HyperliquidAPI:
                             # 避免过度日志记录
                             now = time.time()
                             if now - self.last_price_log.get(coin, 0) > self.price_log_interval:
-                                self.logger.debug(f"价格更新: {coin} = {price}")
+                                self.logger.debug("价格更新: %s = %s", coin, price)
                                 self.last_price_log[coin] = now
                                 
         except websockets.exceptions.ConnectionClosed:
@@ -244,7 +280,7 @@ class HyperliquidAPI:
             payload = {"type": "metaAndAssetCtxs"}
             
             try:
-                response = await self.http_client.post(url, json=payload)
+                response = await self._post_info(payload)
                 
                 if response.status_code != 200:
                     self.logger.error(f"获取资金费率HTTP错误: {response.status_code}")
@@ -319,7 +355,7 @@ class HyperliquidAPI:
             url = f"{self.base_url}/info"
             payload = {"type": "metaAndAssetCtxs"}
             
-            response = await self.http_client.post(url, json=payload)
+            response = await self._post_info(payload)
             
             if response.status_code != 200:
                 self.logger.error(f"批量获取资金费率HTTP错误: {response.status_code}")
@@ -638,9 +674,8 @@ class HyperliquidAPI:
                         return order
                 return None
                 
-            # 在异步函数中执行同步SDK调用
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(None, get_order_status_sync)
+            # 在SDK专用线程池中执行同步SDK调用
+            result = await asyncio.get_running_loop().run_in_executor(self._sdk_pool, get_order_status_sync)
             
             return result or {"error": "订单不存在"}
         except Exception as e:
@@ -741,6 +776,30 @@ class HyperliquidAPI:
             return
             
         self.ws_task = asyncio.create_task(self._ws_price_listener())
+        self.book_publish_task = asyncio.create_task(self._publish_books())
+        
+    async def _publish_books(self):
+        """
+        按固定节奏发布WebSocket订单深度数据
+        
+        接收循环只记录每个币种最新的深度数据引用，由本任务定时生成orderbooks条目，
+        避免每条消息都分配新的字典
+        """
+        while True:
+            await asyncio.sleep(self.book_publish_interval)
+            
+            if not self._latest_levels:
+                continue
+            
+            # 交换缓冲区，只发布上次发布后收到的新数据
+            latest_levels, self._latest_levels = self._latest_levels, {}
+            now = time.time()
+            for coin, levels in latest_levels.items():
+                self.orderbooks[coin] = {
+                    "timestamp": now,
+                    "bids": levels[0],
+                    "asks": levels[1]
+                }
         
     async def _ws_price_listener(self):
         """
@@ -752,7 +811,7 @@ class HyperliquidAPI:
         
         while True:
             try:
-                self.logger.debug(f"尝试连接Hyperliquid WebSocket: {self.ws_url}")
+                self.logger.debug("尝试连接Hyperliquid WebSocket: %s", self.ws_url)
                 
                 async with websockets.connect(self.ws_url) as ws:
                     self.ws = ws
@@ -763,54 +822,57 @@ class HyperliquidAPI:
                     reconnect_delay = 5
                     
                     # 获取币种列表
-                    coins = []
-                    if hasattr(self, "price_coins") and self.price_coins:
-                        coins = self.price_coins
-                    else:
+                    if not getattr(self, "price_coins", None):
                         # 默认监控的币种列表
-                        coins = ["BTC", "ETH", "SOL", "AVAX", "DOGE", "XRP", "ADA", "LINK", "BNB"]
+                        self.set_price_coins(["BTC", "ETH", "SOL", "AVAX", "DOGE", "XRP", "ADA", "LINK", "BNB"])
+                    coins = self.price_coins
                     
-                    # 为每个币种创建订阅
+                    # 为每个币种发送预先构建的订阅消息
                     subscription_count = 0
-                    for coin in coins:
+                    for coin, frame in self._sub_frames:
                         try:
-                            subscribe_msg = {
-                                "method": "subscribe",
-                                "subscription": {
-                                    "type": "l2Book",
-                                    "coin": coin
-                                }
-                            }
-                            
-                            # 发送订阅请求
-                            await ws.send(json.dumps(subscribe_msg))
+                            await ws.send(frame)
                             subscription_count += 1
                         except Exception as e:
                             self.logger.error(f"发送{coin}订阅请求失败: {e}")
                     
-                    self.logger.debug(f"已向Hyperliquid发送{subscription_count}个币种订阅请求")
+                    self.logger.debug("已向Hyperliquid发送%d个币种订阅请求", subscription_count)
                     
-                    # 用于批量价格更新的临时存储
-                    batch_price_updates = {}
+                    # 用于批量价格更新的预分配存储，按币种索引复用槽位
+                    price_coins_set = self._price_coins_set
+                    price_seq = self._price_seq
+                    first_price_events = self._first_price_events
+                    coin_idx = self._coin_idx
+                    batch = self._batch
+                    batch_dirty = self._batch_dirty
+                    batch_count = 0
                     last_batch_time = time.time()
                     
+                    # 热路径中使用局部变量引用，避免每条消息重复查找全局名称
+                    _loads = orjson.loads
+                    _float = float
+                    
                     # 接收和处理消息
                     while True:
                         try:
                             message = await ws.recv()
-                            data_json = json.loads(message)
+                            data_json = _loads(message)
                             
                             # 处理价格数据
                             if data_json.get("channel") == "l2Book":
                                 book_data = data_json.get("data", {})
                                 coin = book_data.get("coin")
                                 
-                                if coin and "levels" in book_data:
+                                # 跳过未跟踪币种的消息，避免无谓的解析和浮点转换
+                                if coin not in price_coins_set:
+                                    continue
+                                
+                                if "levels" in book_data:
                                     levels = book_data["levels"]
                                     if levels and len(levels) >= 2 and len(levels[0]) > 0 and len(levels[1]) > 0:
                                         # 获取最佳买价和卖价
-                                        bid = float(levels[0][0]["px"])
-                                        ask = float(levels[1][0]["px"])
+                                        bid = _float(levels[0][0]["px"])
+                                        ask = _float(levels[1][0]["px"])
                                         
                                         # 计算中间价作为当前价格
                                         price = (bid + ask) / 2
@@ -818,47 +880,61 @@ class HyperliquidAPI:
                                         # 收集价格变化
                                         old_price = self.prices.get(coin)
                                         if old_price is not None:
-                                            # 计算价格变化百分比
-                                            pct_change = abs((price - old_price) / old_price)
-                                            if pct_change > 0.005:  # 超过0.5%的变化
-                                                batch_price_updates[coin] = (old_price, price, pct_change)
+                                            # 用乘法比较阈值，只有显著变化时才做除法计算百分比
+                                            diff = price - old_price
+                                            threshold = 0.005 * old_price
+                                            if diff > threshold or diff < -threshold:  # 超过0.5%的变化
+                                                pct_change = diff / old_price if diff >= 0 else -diff / old_price
+                                                i = coin_idx[coin]
+                                                j = 3 * i
+                                                batch[j] = old_price
+                                                batch[j + 1] = price
+                                                batch[j + 2] = pct_change
+                                                if not batch_dirty[i]:
+                                                    batch_dirty[i] = 1
+                                                    batch_count += 1
                                         
-                                        # 更新当前价格
+                                        # 更新当前价格（只保留最新值，慢消费方不会积压旧报价）
                                         self.prices[coin] = price
+                                        price_seq[coin] += 1
+                                        
+                                        # 唤醒等待该币种首个报价的协程
+                                        if first_price_events:
+                                            event = first_price_events.pop(coin, None)
+                                            if event is not None:
+                                                event.set()
                                         
-                                        # 更新订单深度数据
-                                        self.orderbooks[coin] = {
-                                            "timestamp": time.time(),
-                                            "bids": levels[0],
-                                            "asks": levels[1]
-                                        }
+                                        # 记录最新订单深度数据，由_publish_books定时发布
+                                        self._latest_levels[coin] = levels
                                         
                                         # 检查是否应该生成批量价格更新日志
                                         now = time.time()
-                                        if (batch_price_updates and now - last_batch_time > 300) or len(batch_price_updates) >= 5:
-                                            # 按变化幅度排序并取前5个显著变化
-                                            if batch_price_updates:
+                                        if (batch_count and now - last_batch_time > 300) or batch_count >= 5:
+                                            # 按变化幅度排序并取前5个显著变化（仅在DEBUG级别启用时构建日志文本）
+                                            if batch_count and self.logger.isEnabledFor(logging.DEBUG):
                                                 top_updates = sorted(
-                                                    batch_price_updates.items(),
-                                                    key=lambda x: x[1][2],
+                                                    (i for i, dirty in enumerate(batch_dirty) if dirty),
+                                                    key=lambda i: batch[3 * i + 2],
                                                     reverse=True
                                                 )[:5]
                                                 
                                                 updates_text = []
-                                                for coin, (old, new, pct) in top_updates:
-                                                    updates_text.append(f"{coin}: {old:.2f}→{new:.2f} ({pct*100:.2f}%)")
+                                                for i in top_updates:
+                                                    j = 3 * i
+                                                    updates_text.append(f"{coins[i]}: {batch[j]:.2f}→{batch[j + 1]:.2f} ({batch[j + 2]*100:.2f}%)")
                                                     
                                                 # 记录批量价格更新
-                                                self.logger.debug(f"Hyperliquid价格变化: {', '.join(updates_text)}")
+                                                self.logger.debug("Hyperliquid价格变化: %s", ", ".join(updates_text))
                                             
                                             # 重置批量收集
-                                            batch_price_updates = {}
+                                            batch_dirty[:] = bytes(len(batch_dirty))
+                                            batch_count = 0
                                             last_batch_time = now
 
                         except websockets.exceptions.ConnectionClosed:
                             self.logger.debug("Hyperliquid WebSocket连接已关闭，将重新连接")
                             break
-                        except json.JSONDecodeError:
+                        except orjson.JSONDecodeError:
                             # 忽略无效JSON数据，不记录日志
                             pass
                         except Exception as e:
@@ -866,7 +942,7 @@ class HyperliquidAPI:
                             continue
             except websockets.exceptions.ConnectionClosed:
                 self.ws_connected = False
-                self.logger.debug(f"Hyperliquid WebSocket连接关闭，{reconnect_delay}秒后重连")
+                self.logger.debug("Hyperliquid WebSocket连接关闭，%s秒后重连", reconnect_delay)
                 
             except Exception as e:
                 self.ws_connected = False
@@ -885,7 +961,65 @@ class HyperliquidAPI:
         Args:
             coins: 币种列表，如 ["BTC", "ETH", "SOL"]
         """
-        self.price_coins = coins 
+        self.price_coins = coins
+        
+        # 预分配批量价格变化缓冲区：每个币种占3个槽位(旧价格, 新价格, 变化幅度)
+        self._price_coins_set = frozenset(coins)
+        self._price_seq = {coin: self._price_seq.get(coin, 0) for coin in coins}
+        self._coin_idx = {coin: i for i, coin in enumerate(coins)}
+        self._batch = array.array('d', [0.0] * (3 * len(coins)))
+        self._batch_dirty = bytearray(len(coins))
+        
+        # 预先序列化每个币种的l2Book订阅消息，重连时直接发送
+        # 以str发送以保持文本帧，bytes会被websockets作为二进制帧发送
+        self._sub_frames = [
+            (coin, orjson.dumps({
+                "method": "subscribe",
+                "subscription": {
+                    "type": "l2Book",
+                    "coin": coin
+                }
+            }).decode())
+            for coin in coins
+        ]
+
+    async def wait_for_price(self, symbol: str, timeout: float) -> bool:
+        """
+        等待币种收到首个WebSocket报价
+        
+        已有报价时立即返回，否则在收到报价时被接收循环唤醒，不做固定时长的等待
+        
+        Args:
+            symbol: 币种，如 "BTC"
+            timeout: 最长等待时间（秒）
+            
+        Returns:
+            超时前收到报价返回True，否则返回False
+        """
+        if symbol in self.prices:
+            return True
+        
+        event = self._first_price_events.setdefault(symbol, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def get_price_seq(self, symbol: str) -> int:
+        """
+        获取币种的WebSocket价格更新序号
+        
+        序号在每次收到新报价时递增，消费方可与上次读取的序号比较，
+        判断自上次检查以来是否有新数据，避免重复处理同一报价
+        
+        Args:
+            symbol: 币种，如 "BTC"
+            
+        Returns:
+            价格更新序号，尚未收到WebSocket报价时为0
+        """
+        return self._price_seq.get(symbol, 0)
 
     async def get_positions(self) -> Dict[str, Dict[str, Any]]:
         """
@@ -912,32 +1046,32 @@ class HyperliquidAPI:
             }
             
             # 添加更多的日志记录，便于调试
-            self.logger.debug(f"Hyperliquid REST API请求URL: {url}")
-            self.logger.debug(f"Hyperliquid REST API请求载荷: {payload}")
+            self.logger.debug("Hyperliquid REST API请求URL: %s", url)
+            self.logger.debug("Hyperliquid REST API请求载荷: %s", payload)
             
             try:
-                response = await self.http_client.post(url, json=payload)
-                self.logger.debug(f"Hyperliquid REST API响应状态码: {response.status_code}")
+                response = await self._post_info(payload)
+                self.logger.debug("Hyperliquid REST API响应状态码: %s", response.status_code)
                 
                 if response.status_code != 200:
                     self.logger.error(f"获取用户状态HTTP错误: {response.status_code}, 响应内容: {response.text[:200]}")
                     return {}
                     
                 user_data = response.json()
-                self.logger.debug(f"Hyperliquid REST API响应: {user_data}")
+                self.logger.debug("Hyperliquid REST API响应: %s", user_data)
                 
                 # 解析持仓数据
                 positions = {}
                 if "assetPositions" in user_data:
                     asset_positions = user_data["assetPositions"]
-                    self.logger.debug(f"REST API持仓数据: {asset_positions}")
+                    self.logger.debug("REST API持仓数据: %s", asset_positions)
                     
                     for pos_item in asset_positions:
-                        self.logger.debug(f"处理持仓项: {pos_item}")
+                        self.logger.debug("处理持仓项: %s", pos_item)
                         
                         # 检查持仓项的格式
                         if "position" not in pos_item:
-                            self.logger.debug(f"跳过无效持仓项: {pos_item}")
+                            self.logger.debug("跳过无效持仓项: %s", pos_item)
                             continue
                             
                         pos = pos_item["position"]
@@ -945,13 +1079,13 @@ class HyperliquidAPI:
                         size = pos.get("szi")
                         
                         if not coin or size is None:
-                            self.logger.debug(f"跳过无效持仓项: {pos}")
+                            self.logger.debug("跳过无效持仓项: %s", pos)
                             continue
                             
                         try:
                             size_value = float(size)
                             if size_value == 0:
-                                self.logger.debug(f"跳过零持仓: {coin}")
+                                self.logger.debug("跳过零持仓: %s", coin)
                                 continue
                             
                             side = "BUY" if size_value > 0 else "SELL"
@@ -1012,9 +1146,8 @@ class HyperliquidAPI:
                     self.logger.error(f"Hyperliquid取消订单SDK错误: {e}")
                     return {"success": False, "error": str(e)}
             
-            # 使用线程池执行同步操作
-            loop = asyncio.get_running_loop()
-            result = await loop.run_in_executor(None, cancel_order_sync)
+            # 使用SDK专用线程池执行同步操作
+            result = await asyncio.get_running_loop().run_in_executor(self._sdk_pool, cancel_order_sync)
             
             if result.get("success"):
                 self.logger.info(f"成功取消Hyperliquid订单: {order_id}")
@@ -1032,9 +1165,17 @@ class HyperliquidAPI:
         # 关闭WebSocket
         await self.close_websocket()
         
+        # 停止订单深度发布任务
+        if self.book_publish_task:
+            self.book_publish_task.cancel()
+            self.book_publish_task = None
+        
         # 关闭HTTP客户端
         if self.http_client:
             await self.http_client.aclose()
+        
+        # 关闭SDK线程池
+        self._sdk_pool.shutdown(wait=False)
             
         self.logger.info("已关闭所有Hyperliquid连接") 
 
@@ -1057,7 +1198,7 @@ class HyperliquidAPI:
         # 如果缓存中没有或数据已过期，通过REST API获取
         try:
             # 添加调试日志
-            self.logger.debug(f"获取Hyperliquid订单簿: {symbol}")
+            self.logger.debug("获取Hyperliquid订单簿: %s", symbol)
             
             url = f"{self.base_url}/info"
             payload = {
@@ -1065,10 +1206,10 @@ class HyperliquidAPI:
                 "coin": symbol
             }
             
-            self.logger.debug(f"请求URL: {url}, 数据: {payload}")
+            self.logger.debug("请求URL: %s, 数据: %s", url, payload)
             
             # 发送请求
-            response = await self.http_client.post(url, json=payload)
+            response = await self._post_info(payload)
             
             # 检查响应状态
             if response.status_code != 200:
@@ -1079,16 +1220,19 @@ class HyperliquidAPI:
             data = response.json()
             
             # 添加调试信息
-            self.logger.debug(f"Hyperliquid订单簿原始数据: {data.keys() if isinstance(data, dict) else 'Not a dict'}")
+            debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+            if debug_enabled:
+                self.logger.debug("Hyperliquid订单簿原始数据: %s", data.keys() if isinstance(data, dict) else 'Not a dict')
             
             if isinstance(data, dict) and "levels" in data:
                 levels = data["levels"]
                 
                 # 记录原始数据样本
-                if len(levels) > 0 and levels[0]:
-                    self.logger.debug(f"Hyperliquid订单簿原始bid样本: {levels[0][0] if levels[0] else None}")
-                if len(levels) > 1 and levels[1]:
-                    self.logger.debug(f"Hyperliquid订单簿原始ask样本: {levels[1][0] if levels[1] else None}")
+                if debug_enabled:
+                    if len(levels) > 0 and levels[0]:
+                        self.logger.debug("Hyperliquid订单簿原始bid样本: %s", levels[0][0])
+                    if len(levels) > 1 and levels[1]:
+                        self.logger.debug("Hyperliquid订单簿原始ask样本: %s", levels[1][0])
                 
                 # 转换Hyperliquid格式: [{"px": price, "sz": size}, ...] 为统一格式: [price, size]
                 bids = []
@@ -1108,9 +1252,9 @@ class HyperliquidAPI:
                 
                 # 记录转换后的数据样本
                 if bids:
-                    self.logger.debug(f"Hyperliquid订单簿转换后bid样本: {bids[0]}")
+                    self.logger.debug("Hyperliquid订单簿转换后bid样本: %s", bids[0])
                 if asks:
-                    self.logger.debug(f"Hyperliquid订单簿转换后ask样本: {asks[0]}")
+                    self.logger.debug("Hyperliquid订单簿转换后ask样本: %s", asks[0])
                 
                 # 返回统一格式的订单簿
                 orderbook = {
@@ -1130,4 +1274,17 @@ class HyperliquidAPI:
             self.logger.error(f"获取订单深度出错: {e}")
             import traceback
             self.logger.error(traceback.format_exc())
-            return None 
\ No newline at end of file
+            return None
+    
+    async def get_orderbooks_bulk(self, symbols: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        并发获取多个币种的订单深度数据
+        
+        Args:
+            symbols: 币种列表，如 ["BTC", "ETH"]
+            
+        Returns:
+            币种到订单深度数据的映射，无法获取的币种值为None
+        """
+        orderbooks = await asyncio.gather(*(self.get_orderbook(symbol) for symbol in symbols))
+        return dict(zip(symbols, orderbooks))
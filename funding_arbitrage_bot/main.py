@@ -12,37 +12,24 @@ import logging
 import argparse
 import asyncio
 from typing import Dict, Any
-import yaml
 
-# 添加导入异常处理
-try:
-    # 首先尝试从包内导入
+# 根据模块加载方式选择导入路径：作为包导入时使用相对导入，直接运行脚本时将上级目录加入路径
+if __package__:
+    from .exchanges.backpack_api import BackpackAPI
+    from .exchanges.hyperliquid_api import HyperliquidAPI
+    from .core.arbitrage_engine import ArbitrageEngine
+    from .utils.helpers import load_config
+    from .utils.logger import setup_logger
+else:
+    parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if parent_dir not in sys.path:
+        sys.path.insert(0, parent_dir)
+    
     from funding_arbitrage_bot.exchanges.backpack_api import BackpackAPI
     from funding_arbitrage_bot.exchanges.hyperliquid_api import HyperliquidAPI
     from funding_arbitrage_bot.core.arbitrage_engine import ArbitrageEngine
     from funding_arbitrage_bot.utils.helpers import load_config
     from funding_arbitrage_bot.utils.logger import setup_logger
-except ImportError:
-    try:
-        # 如果从包内导入失败，尝试相对导入
-        from exchanges.backpack_api import BackpackAPI
-        from exchanges.hyperliquid_api import HyperliquidAPI
-        from core.arbitrage_engine import ArbitrageEngine
-        from utils.helpers import load_config
-        from utils.logger import setup_logger
-    except ImportError:
-        # 如果相对导入也失败，可能需要调整Python路径
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        parent_dir = os.path.dirname(current_dir)
-        if parent_dir not in sys.path:
-            sys.path.insert(0, parent_dir)
-        
-        # 再次尝试相对导入
-        from exchanges.backpack_api import BackpackAPI
-        from exchanges.hyperliquid_api import HyperliquidAPI
-        from core.arbitrage_engine import ArbitrageEngine
-        from utils.helpers import load_config
-        from utils.logger import setup_logger
 
 async def run_bot(config: Dict[str, Any], test_mode: bool = False):
     """
@@ -188,42 +175,6 @@ async def main(test: bool = False, config_path: str = None):
         config = load_config(config_path)
         await run_bot(config, test_mode=args.test)
 
-def load_config(config_path: str = None) -> Dict[str, Any]:
-    """
-    加载配置文件
-    
-    Args:
-        config_path: 配置文件路径
-    
-    Returns:
-        配置字典
-    """
-    try:
-        # 如果没有指定配置路径，使用默认路径
-        if not config_path:
-            # 检查用户主目录
-            home_config = os.path.expanduser("~/config.yaml")
-            if os.path.exists(home_config):
-                config_path = home_config
-            else:
-                # 使用默认配置路径
-                config_path = os.path.join(os.path.dirname(__file__), "config.yaml")
-        
-        print(f"加载配置文件: {config_path}")
-        
-        with open(config_path, "r", encoding="utf-8") as f:
-            config = yaml.safe_load(f)
-            
-        # 检查TRACE日志级别设置
-        if config.get("logging", {}).get("level", "").upper() == "TRACE":
-            print("警告: 当前版本不支持TRACE日志级别，将使用DEBUG级别替代")
-            config["logging"]["level"] = "DEBUG"
-            
-        return config
-    except Exception as e:
-        print(f"加载配置文件失败: {e}")
-        return None
-
 if __name__ == "__main__":
     # Windows系统需要设置事件循环策略
     if sys.platform == 'win32':
@@ -1,14 +1,21 @@
 import time
 import asyncio
 import logging
+from collections import deque
 from typing import Dict, List, Any, Optional, Tuple
-import pandas as pd
 from datetime import datetime, timezone
 import numpy as np
 import sys
 
 from funding_arbitrage_bot.exchanges.hyperliquid_api import HyperliquidApi
 from funding_arbitrage_bot.exchanges.backpack_api import BackpackApi
+from funding_arbitrage_bot.utils.helpers import get_backpack_symbol
+
+# 市场数据列式存储的数值字段
+MARKET_FIELDS = (
+    "hl_price", "bp_price", "hl_funding", "bp_funding",
+    "long_slippage", "short_slippage", "total_slippage"
+)
 
 class FundingArbitrageStrategy:
     def __init__(self, config: Dict[str, Any], logger: Optional[logging.Logger] = None, display_manager = None):
@@ -52,24 +59,29 @@ class FundingArbitrageStrategy:
         self.max_slippage_pct = strategy_config.get("max_slippage_pct", 0.1)  # 最大允许滑点百分比
         self.min_liquidity_ratio = strategy_config.get("min_liquidity_ratio", 3.0)  # 最小流动性比率(交易金额的倍数)
         
+        # 由上述参数派生的阈值，避免每次检查重复计算
+        self._required_liquidity_usd = self.trade_size_usd * self.min_liquidity_ratio  # 单边所需最小深度(美元)
+        self._max_total_slippage_pct = self.max_slippage_pct * 2  # 两边合计允许的最大滑点百分比
+        
         # 价格更新和检查设置
         self.price_check_interval = strategy_config.get("price_check_interval", 5)  # 价格检查间隔(秒)
         self.arbitrage_check_interval = strategy_config.get("arbitrage_check_interval", 60)  # 套利检查间隔(秒)
+        self.funding_cache_ttl = strategy_config.get("funding_cache_ttl", 60)  # 资金费率缓存有效期(秒)
         
         # 运行控制
         self.is_running = False
-        self.last_check_time = 0
-        self.last_trade_time = {}  # 币种 -> 上次交易时间
+        self.last_check_time = float("-inf")  # 单调时钟，不受系统时间调整影响
+        self.last_trade_time = {}  # 币种 -> 上次交易时间(单调时钟)
         self.trade_cooldown = strategy_config.get("trade_cooldown", 3600)  # 交易冷却时间(秒)
         
         # 执行模式
         self.execution_mode = strategy_config.get("execution_mode", "simulate")  # simulate, live
         
         # 记录器
-        self.trade_history = []
+        self.trade_history = deque(maxlen=strategy_config.get("trade_history_max", 10000))  # 只保留最近的交易记录
         
         # 设置价格监控的币种列表
-        self.hyperliquid_api.price_coins = self.coins_to_monitor
+        self.hyperliquid_api.set_price_coins(self.coins_to_monitor)
         
         # 统计信息
         self.stats = {
@@ -80,15 +92,31 @@ class FundingArbitrageStrategy:
             "start_time": time.time()
         }
         
-        # 初始化市场数据字典
+        # 市场数据按列存储: 字段 -> 按币种下标排列的数组，未获取到的值为NaN
+        self._coin_idx = {coin: idx for idx, coin in enumerate(self.coins_to_monitor)}
+        self.market_arrays = {
+            field: np.full(len(self.coins_to_monitor), np.nan) for field in MARKET_FIELDS
+        }
+        self._liquidity_by_coin = {}
+        
+        # 供显示使用的市场数据字典，由列式存储生成
         self.market_data = {}
+        self._market_data_dirty = False
+        
+        # 资金费率: 交易所("HL"/"BP") -> 币种 -> 费率
+        self.funding_rates = {"HL": {}, "BP": {}}
+        self._funding_cache_ts = float("-inf")
+        
+        # 单轮检查内的数据缓存，每轮检查开始时清空
+        self._tick_cache = {}
 
-    async def analyze_liquidity(self, coin: str) -> Dict[str, Any]:
+    async def analyze_liquidity(self, coin: str, publish: bool = True) -> Dict[str, Any]:
         """
         分析指定币种在两个交易所的流动性情况和可能的滑点
         
         Args:
             coin: 币种名称
+            publish: 是否将滑点信息写入市场数据并刷新显示，并发评估时由调用方统一写入
         
         Returns:
             包含两个交易所流动性分析结果的字典
@@ -96,51 +124,18 @@ class FundingArbitrageStrategy:
         try:
             results = {}
             
-            # 获取Hyperliquid订单深度数据并分析
-            hl_orderbook = await self.hyperliquid_api.get_orderbook(coin)
-            hl_price = self.hyperliquid_api.prices.get(coin)
-            hl_analysis = await self._analyze_single_exchange_liquidity(
-                "hyperliquid", coin, hl_orderbook, hl_price
+            # 并发获取两个交易所的订单深度和Backpack价格，Hyperliquid价格直接取缓存
+            hl_orderbook, bp_orderbook, bp_price = await asyncio.gather(
+                self.hyperliquid_api.get_orderbook(coin),
+                self.backpack_api.get_orderbook(coin),
+                self._cached_bp_price(coin)
             )
-            results["hyperliquid"] = hl_analysis
-            
-            # 获取Backpack订单深度数据并分析
-            bp_orderbook = await self.backpack_api.get_orderbook(coin)
-            bp_price = await self.backpack_api.get_price(coin)
-            bp_analysis = await self._analyze_single_exchange_liquidity(
-                "backpack", coin, bp_orderbook, bp_price
-            )
-            results["backpack"] = bp_analysis
-            
-            # 综合评估两个交易所的流动性情况
-            has_sufficient_liquidity = (
-                hl_analysis.get("has_sufficient_liquidity", False) and
-                bp_analysis.get("has_sufficient_liquidity", False)
-            )
-            
-            results["combined"] = {
-                "has_sufficient_liquidity": has_sufficient_liquidity,
-                "issues": []
-            }
+            hl_price = self.hyperliquid_api.prices.get(coin)
             
-            # 记录任何流动性问题
-            if not hl_analysis.get("has_sufficient_liquidity", False):
-                results["combined"]["issues"].append(
-                    f"Hyperliquid流动性不足: {hl_analysis.get('error', '未知原因')}"
-                )
-                
-            if not bp_analysis.get("has_sufficient_liquidity", False):
-                results["combined"]["issues"].append(
-                    f"Backpack流动性不足: {bp_analysis.get('error', '未知原因')}"
-                )
+            results.update(self._analyze_books(coin, hl_orderbook, hl_price, bp_orderbook, bp_price))
             
             # 确定做多和做空的交易所
-            hl_funding = self.funding_rates.get(f"HL_{coin}", 0)
-            bp_funding = self.funding_rates.get(f"BP_{coin}", 0)
-            funding_diff = hl_funding - bp_funding if hl_funding is not None and bp_funding is not None else 0
-            
-            long_exchange = "hyperliquid" if funding_diff < 0 else "backpack"
-            short_exchange = "backpack" if funding_diff < 0 else "hyperliquid"
+            long_exchange, short_exchange, _ = self._direction(coin)
             
             # 获取滑点信息
             long_analysis = results.get(long_exchange, {})
@@ -158,16 +153,9 @@ class FundingArbitrageStrategy:
             results["total_slippage"] = total_slippage
             
             # 将滑点信息添加到市场数据中
-            if hasattr(self, "market_data") and coin in self.market_data:
-                self.market_data[coin]["total_slippage"] = total_slippage
-                self.market_data[coin]["long_slippage"] = long_slippage
-                self.market_data[coin]["short_slippage"] = short_slippage
-                self.market_data[coin]["liquidity_analysis"] = results
-                self.logger.debug(f"在流动性分析中添加{coin}的滑点信息: total_slippage={total_slippage}")
-                
-                # 如果有display_manager，立即更新显示
-                if hasattr(self, "display_manager") and self.display_manager:
-                    self.display_manager.update_market_data(self.market_data)
+            if publish and coin in self._coin_idx:
+                self._store_slippage(coin, long_slippage, short_slippage, total_slippage, results)
+                self.logger.debug("在流动性分析中添加%s的滑点信息: total_slippage=%s", coin, total_slippage)
             
             return results
             
@@ -180,7 +168,61 @@ class FundingArbitrageStrategy:
                 }
             }
     
-    async def _analyze_single_exchange_liquidity(
+    def _analyze_books(
+        self, coin: str, hl_orderbook: Dict, hl_price: float, bp_orderbook: Dict, bp_price: float
+    ) -> Dict[str, Any]:
+        """
+        分析两个交易所订单簿的流动性并给出综合评估
+        
+        Args:
+            coin: 币种名称
+            hl_orderbook: Hyperliquid订单深度数据
+            hl_price: Hyperliquid当前价格
+            bp_orderbook: Backpack订单深度数据
+            bp_price: Backpack当前价格
+        
+        Returns:
+            包含hyperliquid、backpack和combined分析结果的字典
+        """
+        results = {}
+        
+        # 分析Hyperliquid流动性
+        hl_analysis = self._analyze_single_exchange_liquidity(
+            "hyperliquid", coin, hl_orderbook, hl_price
+        )
+        results["hyperliquid"] = hl_analysis
+        
+        # 分析Backpack流动性
+        bp_analysis = self._analyze_single_exchange_liquidity(
+            "backpack", coin, bp_orderbook, bp_price
+        )
+        results["backpack"] = bp_analysis
+        
+        # 综合评估两个交易所的流动性情况
+        has_sufficient_liquidity = (
+            hl_analysis.get("has_sufficient_liquidity", False) and
+            bp_analysis.get("has_sufficient_liquidity", False)
+        )
+        
+        results["combined"] = {
+            "has_sufficient_liquidity": has_sufficient_liquidity,
+            "issues": []
+        }
+        
+        # 记录任何流动性问题
+        if not hl_analysis.get("has_sufficient_liquidity", False):
+            results["combined"]["issues"].append(
+                f"Hyperliquid流动性不足: {hl_analysis.get('error', '未知原因')}"
+            )
+        
+        if not bp_analysis.get("has_sufficient_liquidity", False):
+            results["combined"]["issues"].append(
+                f"Backpack流动性不足: {bp_analysis.get('error', '未知原因')}"
+            )
+        
+        return results
+    
+    def _analyze_single_exchange_liquidity(
         self, exchange: str, coin: str, orderbook: Dict, current_price: float
     ) -> Dict[str, Any]:
         """
@@ -205,6 +247,13 @@ class FundingArbitrageStrategy:
             # 计算买入/卖出所需的金额
             trade_size_usd = self.trade_size_usd
             trade_size_coin = trade_size_usd / current_price
+            min_liquidity_ratio = self.min_liquidity_ratio
+            max_slippage_pct = self.max_slippage_pct
+            required_liquidity = self._required_liquidity_usd
+            
+            # 将订单簿解析为数值数组
+            bids_px, bids_sz = self._parse_levels(orderbook.get("bids", []))
+            asks_px, asks_sz = self._parse_levels(orderbook.get("asks", []))
             
             # 分析买入深度
             bid_liquidity = 0
@@ -212,28 +261,13 @@ class FundingArbitrageStrategy:
             bid_slippage = 0
             bid_remaining = 0
             
-            if orderbook["bids"]:
+            if len(bids_px):
                 # 计算买入执行价格和滑点
-                remaining_size = trade_size_coin
-                weighted_price_sum = 0
-                
-                for bid in orderbook["bids"]:
-                    price = float(bid["px"])
-                    size = float(bid["sz"])
-                    
-                    if remaining_size <= 0:
-                        break
-                    
-                    executed_size = min(size, remaining_size)
-                    weighted_price_sum += price * executed_size
-                    bid_liquidity += price * size
-                    remaining_size -= executed_size
-                
-                if remaining_size <= 0:
-                    bid_executed_price = weighted_price_sum / trade_size_coin
+                bid_liquidity, bid_executed_price, bid_remaining = self._walk_book_levels(
+                    bids_px, bids_sz, trade_size_coin
+                )
+                if bid_remaining <= 0:
                     bid_slippage = (current_price - bid_executed_price) / current_price * 100
-                else:
-                    bid_remaining = remaining_size
             
             # 分析卖出深度
             ask_liquidity = 0
@@ -241,52 +275,37 @@ class FundingArbitrageStrategy:
             ask_slippage = 0
             ask_remaining = 0
             
-            if orderbook["asks"]:
+            if len(asks_px):
                 # 计算卖出执行价格和滑点
-                remaining_size = trade_size_coin
-                weighted_price_sum = 0
-                
-                for ask in orderbook["asks"]:
-                    price = float(ask["px"])
-                    size = float(ask["sz"])
-                    
-                    if remaining_size <= 0:
-                        break
-                    
-                    executed_size = min(size, remaining_size)
-                    weighted_price_sum += price * executed_size
-                    ask_liquidity += price * size
-                    remaining_size -= executed_size
-                
-                if remaining_size <= 0:
-                    ask_executed_price = weighted_price_sum / trade_size_coin
+                ask_liquidity, ask_executed_price, ask_remaining = self._walk_book_levels(
+                    asks_px, asks_sz, trade_size_coin
+                )
+                if ask_remaining <= 0:
                     ask_slippage = (ask_executed_price - current_price) / current_price * 100
-                else:
-                    ask_remaining = remaining_size
             
             # 判断流动性是否充足
             has_sufficient_liquidity = (
-                bid_liquidity >= trade_size_usd * self.min_liquidity_ratio and
-                ask_liquidity >= trade_size_usd * self.min_liquidity_ratio and
-                bid_slippage <= self.max_slippage_pct and
-                ask_slippage <= self.max_slippage_pct and
+                bid_liquidity >= required_liquidity and
+                ask_liquidity >= required_liquidity and
+                bid_slippage <= max_slippage_pct and
+                ask_slippage <= max_slippage_pct and
                 bid_remaining <= 0 and
                 ask_remaining <= 0
             )
             
             # 如果流动性不足，确定具体原因
             issues = []
-            if bid_liquidity < trade_size_usd * self.min_liquidity_ratio:
-                issues.append(f"买单深度不足 (${bid_liquidity:.2f} < ${trade_size_usd * self.min_liquidity_ratio:.2f})")
+            if bid_liquidity < required_liquidity:
+                issues.append(f"买单深度不足 (${bid_liquidity:.2f} < ${required_liquidity:.2f})")
             
-            if ask_liquidity < trade_size_usd * self.min_liquidity_ratio:
-                issues.append(f"卖单深度不足 (${ask_liquidity:.2f} < ${trade_size_usd * self.min_liquidity_ratio:.2f})")
+            if ask_liquidity < required_liquidity:
+                issues.append(f"卖单深度不足 (${ask_liquidity:.2f} < ${required_liquidity:.2f})")
             
-            if bid_slippage > self.max_slippage_pct:
-                issues.append(f"买入滑点过高 ({bid_slippage:.4f}% > {self.max_slippage_pct:.4f}%)")
+            if bid_slippage > max_slippage_pct:
+                issues.append(f"买入滑点过高 ({bid_slippage:.4f}% > {max_slippage_pct:.4f}%)")
             
-            if ask_slippage > self.max_slippage_pct:
-                issues.append(f"卖出滑点过高 ({ask_slippage:.4f}% > {self.max_slippage_pct:.4f}%)")
+            if ask_slippage > max_slippage_pct:
+                issues.append(f"卖出滑点过高 ({ask_slippage:.4f}% > {max_slippage_pct:.4f}%)")
             
             if bid_remaining > 0:
                 issues.append(f"买单深度不足以完成交易 (剩余{bid_remaining:.6f}{coin})")
@@ -307,8 +326,8 @@ class FundingArbitrageStrategy:
                 "ask_executed_price": ask_executed_price,
                 "bid_slippage_pct": bid_slippage,
                 "ask_slippage_pct": ask_slippage,
-                "min_liquidity_ratio": self.min_liquidity_ratio,
-                "required_liquidity_usd": trade_size_usd * self.min_liquidity_ratio,
+                "min_liquidity_ratio": min_liquidity_ratio,
+                "required_liquidity_usd": required_liquidity,
                 "error": error
             }
         except Exception as e:
@@ -317,6 +336,60 @@ class FundingArbitrageStrategy:
                 "error": f"分析{exchange}的{coin}流动性时出错: {e}"
             }
 
+    @staticmethod
+    def _parse_levels(levels: List) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        将订单簿单边档位解析为价格和数量数组
+        
+        Args:
+            levels: 档位列表，元素为 {"px": ..., "sz": ...} 或 [price, size]
+            
+        Returns:
+            (价格数组, 数量数组)
+        """
+        count = len(levels)
+        if count and isinstance(levels[0], dict):
+            px = np.fromiter((float(level["px"]) for level in levels), dtype=np.float64, count=count)
+            sz = np.fromiter((float(level["sz"]) for level in levels), dtype=np.float64, count=count)
+            return px, sz
+        
+        book = np.asarray(levels, dtype=np.float64).reshape(count, 2)
+        return book[:, 0], book[:, 1]
+    
+    @staticmethod
+    def _walk_book_levels(
+        px: np.ndarray, sz: np.ndarray, trade_size_coin: float
+    ) -> Tuple[float, float, float]:
+        """
+        按档位顺序模拟吃单，计算成交均价
+        
+        Args:
+            px: 档位价格数组
+            sz: 档位数量数组
+            trade_size_coin: 交易数量(币)
+            
+        Returns:
+            (已扫过档位的美元深度, 成交均价, 未成交剩余数量)，深度不足时成交均价为0
+        """
+        # 第一档即可完全成交时无需累加整个订单簿（深度较好的主流币种很常见）
+        top_size = float(sz[0])
+        if top_size >= trade_size_coin:
+            top_price = float(px[0])
+            return top_price * top_size, top_price, 0.0
+        
+        count = len(px)
+        cum_sz = np.cumsum(sz)
+        
+        # 第一个累计数量覆盖交易数量的档位即为最后成交档位
+        idx = int(np.searchsorted(cum_sz, trade_size_coin))
+        if idx >= count:
+            return float(px @ sz), 0.0, float(trade_size_coin - cum_sz[-1])
+        
+        filled_before = cum_sz[idx - 1] if idx > 0 else 0.0
+        weighted_price_sum = float(px[:idx] @ sz[:idx]) + px[idx] * (trade_size_coin - filled_before)
+        liquidity = float(px[:idx + 1] @ sz[:idx + 1])
+        return liquidity, float(weighted_price_sum / trade_size_coin), 0.0
+
     async def run(self):
         """
         运行套利策略
@@ -325,15 +398,21 @@ class FundingArbitrageStrategy:
         self.logger.info("套利策略已启动")
         
         try:
-            # 初始化市场数据字典
-            self.market_data = {}
+            # 启动Backpack价格推送，检查时优先读取WebSocket价格缓存
+            await self.backpack_api.start_ws_price_stream()
             
+            next_deadline = time.monotonic()
             while self.is_running:
                 # 检查套利机会
                 await self.check_for_opportunities()
                 
-                # 等待指定时间
-                await asyncio.sleep(self.price_check_interval)
+                # 按固定节奏等待到下一个检查时间点，扣除本轮检查耗时，避免累积漂移
+                next_deadline += self.price_check_interval
+                now = time.monotonic()
+                if next_deadline < now:
+                    # 检查耗时超过间隔时不补跑错过的轮次
+                    next_deadline = now
+                await asyncio.sleep(next_deadline - now)
                 
         except asyncio.CancelledError:
             self.logger.info("套利策略已取消")
@@ -345,70 +424,202 @@ class FundingArbitrageStrategy:
         
         self.logger.info("套利策略已停止")
         
+    def _direction(self, coin: str) -> Tuple[str, str, float]:
+        """
+        获取币种的套利方向，同一轮检查内只计算一次
+        
+        Args:
+            coin: 币种
+            
+        Returns:
+            (做多交易所, 做空交易所, 资金费率差)
+        """
+        key = ("dir", coin)
+        direction = self._tick_cache.get(key)
+        if direction is None:
+            hl_funding = self.funding_rates["HL"].get(coin, 0)
+            bp_funding = self.funding_rates["BP"].get(coin, 0)
+            funding_diff = hl_funding - bp_funding if hl_funding is not None and bp_funding is not None else 0
+            
+            if funding_diff < 0:
+                direction = ("hyperliquid", "backpack", funding_diff)
+            else:
+                direction = ("backpack", "hyperliquid", funding_diff)
+            self._tick_cache[key] = direction
+        return direction
+    
+    async def _prefetch_bp_prices(self):
+        """
+        获取所有监控币种的Backpack价格并写入本轮缓存
+        
+        优先读取WebSocket推送的价格缓存（以Backpack交易对为键），
+        只有缓存中没有的币种才并发请求REST接口
+        """
+        prices = self.backpack_api.prices
+        missing = []
+        for coin in self.coins_to_monitor:
+            price = prices.get(get_backpack_symbol(coin))
+            if price is None:
+                missing.append(coin)
+            else:
+                self._tick_cache[("bp_price", coin)] = price
+        
+        if not missing:
+            return
+        
+        fetched = await asyncio.gather(
+            *(self.backpack_api.get_price(get_backpack_symbol(coin)) for coin in missing),
+            return_exceptions=True
+        )
+        for coin, price in zip(missing, fetched):
+            if isinstance(price, Exception):
+                self.logger.error(f"获取{coin}的Backpack价格出错: {price}")
+                price = None
+            # 获取失败也记入本轮缓存，同一轮内不再重复请求
+            self._tick_cache[("bp_price", coin)] = price
+    
+    async def _cached_bp_price(self, coin: str) -> Optional[float]:
+        """
+        获取Backpack价格，同一轮检查内只请求一次
+        
+        Args:
+            coin: 币种
+            
+        Returns:
+            Backpack价格，无法获取时返回None
+        """
+        key = ("bp_price", coin)
+        if key not in self._tick_cache:
+            # get_price会优先返回WebSocket价格缓存，缓存中没有时才请求REST接口
+            self._tick_cache[key] = await self.backpack_api.get_price(get_backpack_symbol(coin))
+        return self._tick_cache[key]
+    
     async def update_market_data(self):
         """
-        更新市场数据字典，用于显示和记录
+        更新市场数据，用于显示和记录
         """
         try:
-            # 如果市场数据字典尚未初始化
-            if not hasattr(self, "market_data"):
-                self.market_data = {}
-                
+            hl_prices = self.market_arrays["hl_price"]
+            bp_prices = self.market_arrays["bp_price"]
+            hl_fundings = self.market_arrays["hl_funding"]
+            bp_fundings = self.market_arrays["bp_funding"]
+            
             # 更新每个币种的市场数据
-            for coin in self.coins_to_monitor:
-                if coin not in self.market_data:
-                    self.market_data[coin] = {}
-                    
+            for coin, idx in self._coin_idx.items():
                 # 获取Hyperliquid数据
                 hl_price = self.hyperliquid_api.prices.get(coin)
-                hl_funding_rate = self.funding_rates.get(f"HL_{coin}")
+                hl_funding_rate = self.funding_rates["HL"].get(coin)
                 
                 if hl_price:
-                    if "hyperliquid" not in self.market_data[coin]:
-                        self.market_data[coin]["hyperliquid"] = {}
-                    
-                    self.market_data[coin]["hyperliquid"]["price"] = hl_price
+                    hl_prices[idx] = hl_price
                     
                 if hl_funding_rate is not None:
-                    if "hyperliquid" not in self.market_data[coin]:
-                        self.market_data[coin]["hyperliquid"] = {}
-                        
-                    self.market_data[coin]["hyperliquid"]["funding_rate"] = hl_funding_rate
-                    # 调整为8小时资金费率，方便与BP比较
-                    self.market_data[coin]["hyperliquid"]["adjusted_funding_rate"] = hl_funding_rate * 8
+                    hl_fundings[idx] = hl_funding_rate
                     
                 # 获取Backpack数据
-                bp_price = await self.backpack_api.get_price(coin)
-                bp_funding_rate = self.funding_rates.get(f"BP_{coin}")
+                bp_price = await self._cached_bp_price(coin)
+                bp_funding_rate = self.funding_rates["BP"].get(coin)
                 
                 if bp_price:
-                    if "backpack" not in self.market_data[coin]:
-                        self.market_data[coin]["backpack"] = {}
-                        
-                    self.market_data[coin]["backpack"]["price"] = bp_price
+                    bp_prices[idx] = bp_price
                     
                 if bp_funding_rate is not None:
-                    if "backpack" not in self.market_data[coin]:
-                        self.market_data[coin]["backpack"] = {}
-                        
-                    self.market_data[coin]["backpack"]["funding_rate"] = bp_funding_rate
+                    bp_fundings[idx] = bp_funding_rate
             
-            # 更新DisplayManager显示
-            if self.display_manager:
-                self.display_manager.update_market_data(self.market_data)
-                    
-            return self.market_data
+            # 显示在本轮检查结束时统一刷新
+            self._market_data_dirty = True
             
         except Exception as e:
             self.logger.error(f"更新市场数据出错: {e}")
-            return {}
+    
+    def _store_slippage(
+        self, coin: str, long_slippage: float, short_slippage: float,
+        total_slippage: float, liquidity_analysis: Dict[str, Any]
+    ):
+        """
+        记录币种的滑点信息
+        
+        Args:
+            coin: 币种
+            long_slippage: 做多交易所滑点
+            short_slippage: 做空交易所滑点
+            total_slippage: 总滑点
+            liquidity_analysis: 流动性分析结果
+        """
+        idx = self._coin_idx[coin]
+        self.market_arrays["long_slippage"][idx] = long_slippage
+        self.market_arrays["short_slippage"][idx] = short_slippage
+        self.market_arrays["total_slippage"][idx] = total_slippage
+        self._liquidity_by_coin[coin] = liquidity_analysis
+        self._market_data_dirty = True
+    
+    def _flush_market_data(self):
+        """
+        市场数据有变化时重新生成显示用字典并刷新DisplayManager
+        """
+        if not self._market_data_dirty:
+            return
+        
+        self.market_data = self._market_data_view()
+        self._market_data_dirty = False
+        
+        if self.display_manager:
+            try:
+                self.display_manager.update_market_data(self.market_data)
+            except Exception as e:
+                self.logger.error(f"更新显示时出错: {e}")
+    
+    def _market_data_view(self) -> Dict[str, Dict]:
+        """
+        由列式存储生成DisplayManager使用的市场数据字典
+        
+        Returns:
+            币种 -> 市场数据字典，只包含已获取到的字段
+        """
+        arrays = {field: values.tolist() for field, values in self.market_arrays.items()}
+        market_data = {}
+        
+        for coin, idx in self._coin_idx.items():
+            coin_data = {}
+            
+            # NaN与自身不相等，据此跳过尚未获取的字段
+            hl_price = arrays["hl_price"][idx]
+            hl_funding_rate = arrays["hl_funding"][idx]
+            if hl_price == hl_price or hl_funding_rate == hl_funding_rate:
+                hl_data = coin_data["hyperliquid"] = {}
+                if hl_price == hl_price:
+                    hl_data["price"] = hl_price
+                if hl_funding_rate == hl_funding_rate:
+                    hl_data["funding_rate"] = hl_funding_rate
+                    # 调整为8小时资金费率，方便与BP比较
+                    hl_data["adjusted_funding_rate"] = hl_funding_rate * 8
+            
+            bp_price = arrays["bp_price"][idx]
+            bp_funding_rate = arrays["bp_funding"][idx]
+            if bp_price == bp_price or bp_funding_rate == bp_funding_rate:
+                bp_data = coin_data["backpack"] = {}
+                if bp_price == bp_price:
+                    bp_data["price"] = bp_price
+                if bp_funding_rate == bp_funding_rate:
+                    bp_data["funding_rate"] = bp_funding_rate
+            
+            total_slippage = arrays["total_slippage"][idx]
+            if total_slippage == total_slippage:
+                coin_data["total_slippage"] = total_slippage
+                coin_data["long_slippage"] = arrays["long_slippage"][idx]
+                coin_data["short_slippage"] = arrays["short_slippage"][idx]
+                coin_data["liquidity_analysis"] = self._liquidity_by_coin.get(coin, {})
+            
+            market_data[coin] = coin_data
+        
+        return market_data
     
     async def check_for_opportunities(self):
         """
         检查所有交易对的套利机会
         扩展版本: 检查资金费率、价格差异、流动性情况和滑点控制
         """
-        current_time = time.time()
+        current_time = time.monotonic()
         
         # 避免频繁检查
         if current_time - self.last_check_time < self.arbitrage_check_interval:
@@ -416,104 +627,106 @@ class FundingArbitrageStrategy:
         
         self.last_check_time = current_time
         self.stats["checks"] += 1
+        self._tick_cache = {}
         
         # 获取资金费率信息
         try:
             await self.update_funding_rates()
             
+            # 一次性并发获取本轮所需的Backpack价格
+            await self._prefetch_bp_prices()
+            
             # 更新市场数据
             await self.update_market_data()
             
-            # 检查每个币种的套利机会
-            for coin in self.coins_to_monitor:
-                # 检查是否在冷却期
-                if coin in self.last_trade_time:
-                    time_since_last_trade = current_time - self.last_trade_time[coin]
-                    if time_since_last_trade < self.trade_cooldown:
-                        cooldown_left = self.trade_cooldown - time_since_last_trade
-                        self.logger.debug(f"{coin}仍在交易冷却期 (剩余{cooldown_left:.1f}秒)")
-                        continue
-                
-                # 获取资金费率
-                hl_funding_rate = self.funding_rates.get(f"HL_{coin}", 0)
-                bp_funding_rate = self.funding_rates.get(f"BP_{coin}", 0)
-                
-                if hl_funding_rate is None or bp_funding_rate is None:
-                    self.logger.warning(f"无法获取{coin}的完整资金费率")
+            # 并发采集所有币种的行情和流动性数据，随后串行处理决策，避免并发修改共享状态
+            coins = self.coins_to_monitor
+            evaluations = await asyncio.gather(
+                *(self._evaluate_coin(coin, current_time) for coin in coins),
+                return_exceptions=True
+            )
+            
+            # 整理每个币种的做多/做空方向和滑点
+            candidates = []
+            for coin, evaluation in zip(coins, evaluations):
+                if isinstance(evaluation, Exception):
+                    self.logger.error(f"评估{coin}套利机会时出错: {evaluation}")
                     continue
-                
-                # 计算资金费率差异
-                funding_diff = hl_funding_rate - bp_funding_rate
-                abs_funding_diff = abs(funding_diff)
-                
-                # 获取两个交易所的价格
-                hl_price = self.hyperliquid_api.prices.get(coin)
-                bp_price = await self.backpack_api.get_price(coin)
-                
-                if not hl_price or not bp_price:
-                    self.logger.warning(f"无法获取{coin}的完整价格信息")
+                    
+                if evaluation is None:
                     continue
                 
-                # 计算价格差异
-                price_diff_pct = abs(hl_price - bp_price) / min(hl_price, bp_price)
-                
-                # 分析两个交易所的流动性情况（提前获取滑点信息用于日志记录）
-                liquidity_analysis = await self.analyze_liquidity(coin)
-                combined_analysis = liquidity_analysis.get("combined", {})
+                liquidity_analysis = evaluation["liquidity_analysis"]
                 
                 # 确定做多和做空的交易所
-                long_exchange = "hyperliquid" if funding_diff < 0 else "backpack"
-                short_exchange = "backpack" if funding_diff < 0 else "hyperliquid"
+                long_exchange, short_exchange, _ = self._direction(coin)
                 
                 # 获取相应的滑点信息
-                long_analysis = liquidity_analysis.get(long_exchange, {})
-                short_analysis = liquidity_analysis.get(short_exchange, {})
+                long_slippage = liquidity_analysis.get(long_exchange, {}).get("bid_slippage_pct", 0)
+                short_slippage = liquidity_analysis.get(short_exchange, {}).get("ask_slippage_pct", 0)
                 
-                long_slippage = long_analysis.get("bid_slippage_pct", 0)
-                short_slippage = short_analysis.get("ask_slippage_pct", 0)
+                candidates.append((coin, evaluation, long_exchange, short_exchange, long_slippage, short_slippage))
+            
+            # 一次性计算所有币种的套利条件
+            conditions = self._evaluate_conditions(
+                np.array([c[1]["funding_diff"] for c in candidates], dtype=np.float64),
+                np.array([c[1]["price_diff_pct"] for c in candidates], dtype=np.float64),
+                np.array([c[4] + c[5] for c in candidates], dtype=np.float64)
+            )
+            
+            # 检查每个币种的套利机会
+            debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+            for idx, (coin, evaluation, long_exchange, short_exchange, long_slippage, short_slippage) in enumerate(candidates):
+                hl_funding_rate = evaluation["hl_funding_rate"]
+                bp_funding_rate = evaluation["bp_funding_rate"]
+                funding_diff = evaluation["funding_diff"]
+                abs_funding_diff = abs(funding_diff)
+                hl_price = evaluation["hl_price"]
+                bp_price = evaluation["bp_price"]
+                price_diff_pct = evaluation["price_diff_pct"]
+                liquidity_analysis = evaluation["liquidity_analysis"]
+                combined_analysis = liquidity_analysis.get("combined", {})
                 total_slippage = long_slippage + short_slippage
                 
                 # 判断滑点是否在允许范围内
-                slippage_ok = total_slippage <= self.max_slippage_pct * 2
+                slippage_ok = bool(conditions["slippage_ok"][idx])
                 
                 # 添加INFO级别的滑点信息日志，确保在INFO级别也可以看到
                 self.logger.info(
-                    f"{coin} - 滑点分析: 总滑点={total_slippage:.4f}%, "
-                    f"做多交易所({long_exchange})滑点={long_slippage:.4f}%, "
-                    f"做空交易所({short_exchange})滑点={short_slippage:.4f}%, "
-                    f"是否符合条件: {'' if slippage_ok else '不'}符合"
+                    "%s - 滑点分析: 总滑点=%.4f%%, 做多交易所(%s)滑点=%.4f%%, 做空交易所(%s)滑点=%.4f%%, 是否符合条件: %s符合",
+                    coin, total_slippage, long_exchange, long_slippage, short_exchange, short_slippage,
+                    '' if slippage_ok else '不'
                 )
                 
                 # 将滑点信息添加到市场数据中，用于显示
-                if coin in self.market_data:
-                    self.market_data[coin]["total_slippage"] = total_slippage
-                    self.market_data[coin]["long_slippage"] = long_slippage
-                    self.market_data[coin]["short_slippage"] = short_slippage
-                    self.market_data[coin]["liquidity_analysis"] = liquidity_analysis
-                    self.logger.debug(f"已将{coin}的滑点信息添加到市场数据: total_slippage={total_slippage}")
+                if coin in self._coin_idx:
+                    self._store_slippage(coin, long_slippage, short_slippage, total_slippage, liquidity_analysis)
+                    self.logger.debug("已将%s的滑点信息添加到市场数据: total_slippage=%s", coin, total_slippage)
                 
                 # 记录基本信息（添加滑点信息）
-                self.logger.debug(
-                    f"{coin} - 资金费率差: {funding_diff:.6f} "
-                    f"(HL: {hl_funding_rate:.6f}, BP: {bp_funding_rate:.6f}), "
-                    f"价格差: {price_diff_pct:.4%} "
-                    f"(HL: {hl_price:.2f}, BP: {bp_price:.2f}), "
-                    f"滑点: {long_exchange}买入{long_slippage:.4f}%, "
-                    f"{short_exchange}卖出{short_slippage:.4f}%, "
-                    f"总滑点: {total_slippage:.4f}% "
-                    f"[{'' if slippage_ok else '不'}符合条件: {self.max_slippage_pct * 2:.4f}%]"
-                )
+                if debug_enabled:
+                    self.logger.debug(
+                        f"{coin} - 资金费率差: {funding_diff:.6f} "
+                        f"(HL: {hl_funding_rate:.6f}, BP: {bp_funding_rate:.6f}), "
+                        f"价格差: {price_diff_pct:.4%} "
+                        f"(HL: {hl_price:.2f}, BP: {bp_price:.2f}), "
+                        f"滑点: {long_exchange}买入{long_slippage:.4f}%, "
+                        f"{short_exchange}卖出{short_slippage:.4f}%, "
+                        f"总滑点: {total_slippage:.4f}% "
+                        f"[{'' if slippage_ok else '不'}符合条件: {self._max_total_slippage_pct:.4f}%]"
+                    )
                 
                 # 资金费率和价格差异条件检查
-                funding_ok = abs_funding_diff >= self.min_funding_diff
-                price_ok = price_diff_pct <= self.min_price_diff_pct
+                funding_ok = bool(conditions["funding_ok"][idx])
+                price_ok = bool(conditions["price_ok"][idx])
                 
-                self.logger.debug(
-                    f"{coin} - 条件检查: "
-                    f"资金费率差: {abs_funding_diff:.6f}% >= {self.min_funding_diff:.6f}% [{'' if funding_ok else '不'}符合], "
-                    f"价格差: {price_diff_pct:.4%} <= {self.min_price_diff_pct:.4%} [{'' if price_ok else '不'}符合], "
-                    f"滑点: {total_slippage:.4f}% <= {self.max_slippage_pct * 2:.4f}% [{'' if slippage_ok else '不'}符合]"
-                )
+                if debug_enabled:
+                    self.logger.debug(
+                        f"{coin} - 条件检查: "
+                        f"资金费率差: {abs_funding_diff:.6f}% >= {self.min_funding_diff:.6f}% [{'' if funding_ok else '不'}符合], "
+                        f"价格差: {price_diff_pct:.4%} <= {self.min_price_diff_pct:.4%} [{'' if price_ok else '不'}符合], "
+                        f"滑点: {total_slippage:.4f}% <= {self._max_total_slippage_pct:.4f}% [{'' if slippage_ok else '不'}符合]"
+                    )
                 
                 # 检查是否满足套利条件
                 if funding_ok and price_ok:
@@ -524,30 +737,31 @@ class FundingArbitrageStrategy:
                         self.logger.info(f"{coin}套利机会 - 但{issues_text}")
                         
                         # 记录详细流动性分析结果
-                        if self.logger.level <= logging.DEBUG:
-                            self.logger.debug(f"Hyperliquid流动性分析: {liquidity_analysis.get('hyperliquid', {})}")
-                            self.logger.debug(f"Backpack流动性分析: {liquidity_analysis.get('backpack', {})}")
+                        if debug_enabled:
+                            self.logger.debug("Hyperliquid流动性分析: %s", liquidity_analysis.get('hyperliquid', {}))
+                            self.logger.debug("Backpack流动性分析: %s", liquidity_analysis.get('backpack', {}))
                         continue
                     
                     # 检查滑点是否在可接受范围内
                     if not slippage_ok:
                         self.logger.info(
-                            f"{coin}套利机会 - 但总滑点过高: {total_slippage:.4f}% > {self.max_slippage_pct * 2:.4f}%, "
+                            f"{coin}套利机会 - 但总滑点过高: {total_slippage:.4f}% > {self._max_total_slippage_pct:.4f}%, "
                             f"({long_exchange}买入{long_slippage:.4f}%, {short_exchange}卖出{short_slippage:.4f}%)"
                         )
                         continue
                     
                     # 检查预期收益是否能覆盖滑点成本
-                    expected_daily_return = abs(funding_diff) * self.trade_size_usd
-                    slippage_cost = (total_slippage / 100) * self.trade_size_usd
-                    profit_cover_slippage = slippage_cost <= expected_daily_return * 0.5
+                    expected_daily_return = float(conditions["expected_daily_return"][idx])
+                    slippage_cost = float(conditions["slippage_cost"][idx])
+                    profit_cover_slippage = bool(conditions["profit_cover_slippage"][idx])
                     
-                    self.logger.debug(
-                        f"{coin} - 收益分析: "
-                        f"预期日收益: ${expected_daily_return:.2f}, "
-                        f"滑点成本: ${slippage_cost:.2f}, "
-                        f"成本占比: {slippage_cost/expected_daily_return*100:.2f}% <= 50% [{'' if profit_cover_slippage else '不'}符合]"
-                    )
+                    if debug_enabled:
+                        self.logger.debug(
+                            f"{coin} - 收益分析: "
+                            f"预期日收益: ${expected_daily_return:.2f}, "
+                            f"滑点成本: ${slippage_cost:.2f}, "
+                            f"成本占比: {slippage_cost/expected_daily_return*100:.2f}% <= 50% [{'' if profit_cover_slippage else '不'}符合]"
+                        )
                     
                     if not profit_cover_slippage:
                         self.logger.info(
@@ -564,7 +778,7 @@ class FundingArbitrageStrategy:
                         f"价格差: {price_diff_pct:.4%}, "
                         f"预计滑点: {long_exchange}买入{long_slippage:.4f}%, "
                         f"{short_exchange}卖出{short_slippage:.4f}%, "
-                        f"总滑点: {total_slippage:.4f}% [符合条件: <={self.max_slippage_pct * 2:.4f}%], "
+                        f"总滑点: {total_slippage:.4f}% [符合条件: <={self._max_total_slippage_pct:.4f}%], "
                         f"预期收益: ${expected_daily_return:.2f}/天, 滑点成本: ${slippage_cost:.2f} "
                         f"[符合条件: <={expected_daily_return * 0.5:.2f}]"
                     )
@@ -573,18 +787,99 @@ class FundingArbitrageStrategy:
                     if self.execution_mode == "live":
                         await self.execute_arbitrage(coin, funding_diff, liquidity_analysis)
             
-            # 在所有币种检查完成后，再次更新市场数据以确保滑点信息显示在终端表格中
-            if self.display_manager:
-                self.display_manager.update_market_data(self.market_data)
-                
         except Exception as e:
             self.logger.error(f"检查套利机会时出错: {e}")
-            # 即使出错也尝试更新显示
-            if self.display_manager:
-                try:
-                    self.display_manager.update_market_data(self.market_data)
-                except Exception as display_e:
-                    self.logger.error(f"更新显示时出错: {display_e}")
+        
+        # 在所有币种检查完成后统一刷新一次显示，出错时也会显示已更新的数据
+        self._flush_market_data()
+
+    def _evaluate_conditions(
+        self, funding_diff: np.ndarray, price_diff_pct: np.ndarray, total_slippage: np.ndarray
+    ) -> Dict[str, np.ndarray]:
+        """
+        向量化计算所有币种的套利条件
+        
+        Args:
+            funding_diff: 资金费率差数组
+            price_diff_pct: 价格差异比例数组
+            total_slippage: 总滑点百分比数组
+            
+        Returns:
+            各条件的布尔数组及预期日收益、滑点成本数组，下标与输入一致
+        """
+        trade_size_usd = self.trade_size_usd
+        expected_daily_return = np.abs(funding_diff) * trade_size_usd
+        slippage_cost = (total_slippage / 100) * trade_size_usd
+        
+        return {
+            "funding_ok": np.abs(funding_diff) >= self.min_funding_diff,
+            "price_ok": price_diff_pct <= self.min_price_diff_pct,
+            "slippage_ok": total_slippage <= self._max_total_slippage_pct,
+            "expected_daily_return": expected_daily_return,
+            "slippage_cost": slippage_cost,
+            "profit_cover_slippage": slippage_cost <= expected_daily_return * 0.5
+        }
+
+    async def _evaluate_coin(self, coin: str, current_time: float) -> Optional[Dict[str, Any]]:
+        """
+        采集单个币种的资金费率、价格和流动性数据
+        
+        只读取数据、不修改策略状态，可与其他币种并发执行
+        
+        Args:
+            coin: 币种
+            current_time: 本轮检查开始的单调时钟时间
+            
+        Returns:
+            评估数据字典，币种处于冷却期、数据不完整或资金费率差/价格差不满足条件时返回None
+        """
+        # 检查是否在冷却期
+        if coin in self.last_trade_time:
+            time_since_last_trade = current_time - self.last_trade_time[coin]
+            if time_since_last_trade < self.trade_cooldown:
+                cooldown_left = self.trade_cooldown - time_since_last_trade
+                self.logger.debug("%s仍在交易冷却期 (剩余%.1f秒)", coin, cooldown_left)
+                return None
+        
+        # 获取资金费率
+        hl_funding_rate = self.funding_rates["HL"].get(coin, 0)
+        bp_funding_rate = self.funding_rates["BP"].get(coin, 0)
+        
+        if hl_funding_rate is None or bp_funding_rate is None:
+            self.logger.warning(f"无法获取{coin}的完整资金费率")
+            return None
+        
+        # 获取两个交易所的价格
+        hl_price = self.hyperliquid_api.prices.get(coin)
+        bp_price = await self._cached_bp_price(coin)
+        
+        if not hl_price or not bp_price:
+            self.logger.warning(f"无法获取{coin}的完整价格信息")
+            return None
+        
+        funding_diff = self._direction(coin)[2]
+        price_diff_pct = abs(hl_price - bp_price) / min(hl_price, bp_price)
+        
+        # 资金费率差或价格差不满足条件时无需获取订单簿分析流动性
+        if abs(funding_diff) < self.min_funding_diff or price_diff_pct > self.min_price_diff_pct:
+            self.logger.debug(
+                "%s - 资金费率差%.6f或价格差%.4f%%不满足条件，跳过流动性分析",
+                coin, funding_diff, price_diff_pct * 100
+            )
+            return None
+        
+        # 分析两个交易所的流动性情况（提前获取滑点信息用于日志记录）
+        liquidity_analysis = await self.analyze_liquidity(coin, publish=False)
+        
+        return {
+            "hl_funding_rate": hl_funding_rate,
+            "bp_funding_rate": bp_funding_rate,
+            "funding_diff": funding_diff,
+            "hl_price": hl_price,
+            "bp_price": bp_price,
+            "price_diff_pct": price_diff_pct,
+            "liquidity_analysis": liquidity_analysis
+        }
 
     async def execute_arbitrage(self, coin: str, funding_diff: float, liquidity_analysis: Dict[str, Any]):
         """
@@ -597,11 +892,10 @@ class FundingArbitrageStrategy:
         """
         try:
             # 记录交易时间
-            self.last_trade_time[coin] = time.time()
+            self.last_trade_time[coin] = time.monotonic()
             
             # 确定交易方向
-            long_exchange = "hyperliquid" if funding_diff < 0 else "backpack"
-            short_exchange = "backpack" if funding_diff < 0 else "hyperliquid"
+            long_exchange, short_exchange, _ = self._direction(coin)
             
             # 获取相应交易所的分析结果
             long_analysis = liquidity_analysis.get(long_exchange, {})
@@ -663,39 +957,55 @@ class FundingArbitrageStrategy:
         except Exception as e:
             self.logger.error(f"执行{coin}套利时出错: {e}") 
 
-    async def update_funding_rates(self):
+    async def update_funding_rates(self, force: bool = False):
         """
         更新所有监控币种的资金费率
+        
+        Args:
+            force: 是否忽略缓存有效期强制刷新
         """
         try:
-            # 初始化资金费率字典
-            if not hasattr(self, "funding_rates"):
-                self.funding_rates = {}
-            
-            # 获取Hyperliquid资金费率
-            hl_funding_rates = await self.hyperliquid_api.get_funding_rates()
-            if hl_funding_rates:
-                for coin, rate in hl_funding_rates.items():
-                    self.funding_rates[f"HL_{coin}"] = rate
-            
-            # 获取Backpack资金费率
-            bp_funding_rates = await self.backpack_api.get_funding_rates()
-            if bp_funding_rates:
-                for coin, rate in bp_funding_rates.items():
-                    self.funding_rates[f"BP_{coin}"] = rate
+            # 资金费率按小时结算，缓存有效期内不重复请求
+            now = time.monotonic()
+            if not force and now - self._funding_cache_ts < self.funding_cache_ttl:
+                return
+            
+            # 并发获取两个交易所的资金费率
+            hl_funding_rates, bp_funding_rates = await asyncio.gather(
+                self.hyperliquid_api.get_all_funding_rates(),
+                self.backpack_api.get_all_funding_rates(),
+                return_exceptions=True
+            )
+            
+            if isinstance(hl_funding_rates, Exception):
+                self.logger.error(f"获取Hyperliquid资金费率出错: {hl_funding_rates}")
+            elif hl_funding_rates:
+                self.funding_rates["HL"].update(hl_funding_rates)
+            
+            if isinstance(bp_funding_rates, Exception):
+                self.logger.error(f"获取Backpack资金费率出错: {bp_funding_rates}")
+            elif bp_funding_rates:
+                self.funding_rates["BP"].update(bp_funding_rates)
+            
+            # 两个交易所都获取成功才刷新缓存时间，否则下一轮重试
+            if not isinstance(hl_funding_rates, Exception) and not isinstance(bp_funding_rates, Exception):
+                self._funding_cache_ts = now
             
             # 记录资金费率更新
-            funding_info = []
-            for coin in self.coins_to_monitor:
-                hl_rate = self.funding_rates.get(f"HL_{coin}")
-                bp_rate = self.funding_rates.get(f"BP_{coin}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                hl_get = self.funding_rates["HL"].get
+                bp_get = self.funding_rates["BP"].get
+                funding_info = []
+                for coin in self.coins_to_monitor:
+                    hl_rate = hl_get(coin)
+                    bp_rate = bp_get(coin)
+                    
+                    if hl_rate is not None and bp_rate is not None:
+                        diff = hl_rate - bp_rate
+                        funding_info.append(f"{coin}: HL={hl_rate:.6f}, BP={bp_rate:.6f}, 差={diff:.6f}")
                 
-                if hl_rate is not None and bp_rate is not None:
-                    diff = hl_rate - bp_rate
-                    funding_info.append(f"{coin}: HL={hl_rate:.6f}, BP={bp_rate:.6f}, 差={diff:.6f}")
-            
-            if funding_info:
-                self.logger.debug(f"资金费率更新: {'; '.join(funding_info)}")
+                if funding_info:
+                    self.logger.debug("资金费率更新: %s", '; '.join(funding_info))
                 
         except Exception as e:
             self.logger.error(f"更新资金费率时出错: {e}")
@@ -723,13 +1033,15 @@ class FundingArbitrageStrategy:
             stats["conversion_rate"] = 0
             
         # 记录资金费率信息
-        stats["funding_rates"] = {}
+        stats["funding_rates"] = stats_rates = {}
+        hl_get = self.funding_rates["HL"].get
+        bp_get = self.funding_rates["BP"].get
         for coin in self.coins_to_monitor:
-            hl_rate = self.funding_rates.get(f"HL_{coin}")
-            bp_rate = self.funding_rates.get(f"BP_{coin}")
+            hl_rate = hl_get(coin)
+            bp_rate = bp_get(coin)
             
             if hl_rate is not None and bp_rate is not None:
-                stats["funding_rates"][coin] = {
+                stats_rates[coin] = {
                     "hyperliquid": hl_rate,
                     "backpack": bp_rate,
                     "diff": hl_rate - bp_rate
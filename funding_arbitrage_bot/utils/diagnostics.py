@@ -11,9 +11,23 @@ import asyncio
 import argparse
 import logging
 import yaml
-import json
 import traceback
+import httpx
+import orjson
 from pathlib import Path
+from typing import List, Optional, Tuple
+
+# 优先使用libyaml的C扩展解析器，未安装时回退到纯Python实现
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+# uvloop为可选依赖，安装后使用libuv事件循环
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 # 设置日志格式
 logging.basicConfig(
@@ -26,89 +40,71 @@ logging.basicConfig(
 
 logger = logging.getLogger('hl_diagnostics')
 
-async def test_hyperliquid_api(config_path: str, symbol: str = "BTC"):
+_client: Optional[httpx.AsyncClient] = None
+
+# 固定的REST探测请求，模块加载时序列化一次
+_INFO_URL = "https://api.hyperliquid.xyz/info"
+_META_PAYLOAD = orjson.dumps({"type": "metaAndAssetCtxs"})
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+def _get_client() -> httpx.AsyncClient:
     """
-    测试Hyperliquid API连接和资金费率获取
+    获取模块共享的HTTP客户端
     
-    Args:
-        config_path: 配置文件路径
-        symbol: 要测试的币种
-    """
-    # 打印诊断头部
-    logger.info("=" * 50)
-    logger.info("Hyperliquid API连接和资金费率获取诊断工具")
-    logger.info("=" * 50)
+    启用HTTP/2和keep-alive，多次诊断请求复用同一连接
     
-    # 加载配置
-    try:
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
-        logger.info(f"已成功加载配置文件: {config_path}")
-    except Exception as e:
-        logger.error(f"加载配置文件失败: {e}")
-        return
-    
-    # 提取Hyperliquid API凭证
-    hl_api_key = config.get('exchanges', {}).get('hyperliquid', {}).get('api_key')
-    hl_api_secret = config.get('exchanges', {}).get('hyperliquid', {}).get('api_secret')
-    
-    if not hl_api_key or not hl_api_secret:
-        logger.error("配置文件中未找到Hyperliquid API凭证")
-        return
-    
-    logger.info(f"已找到Hyperliquid API凭证，钱包地址前缀: {hl_api_key[:10]}...")
-    
-    # 导入Hyperliquid API
-    try:
-        from funding_arbitrage_bot.exchanges.hyperliquid_api import HyperliquidAPI
-        logger.info("已成功导入HyperliquidAPI类")
-    except ImportError:
-        logger.error("导入HyperliquidAPI类失败，请确保您在正确的目录中运行此脚本")
-        import traceback
-        logger.debug(f"导入错误详情: {traceback.format_exc()}")
-        return
-    
-    # 创建API实例
-    try:
-        api = HyperliquidAPI(
-            api_key=hl_api_key,
-            api_secret=hl_api_secret,
-            logger=logger,
-            config=config
+    Returns:
+        共享的httpx.AsyncClient
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=10.0,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
         )
-        logger.info("已成功创建HyperliquidAPI实例")
-    except Exception as e:
-        logger.error(f"创建HyperliquidAPI实例失败: {e}")
-        return
+    return _client
+
+async def _close_client():
+    """关闭模块共享的HTTP客户端"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+async def _do_rest_probe(client: httpx.AsyncClient, symbol: str) -> List[Tuple[int, str]]:
+    """
+    直接调用Hyperliquid REST API，检查指定币种的资产上下文和资金费率
     
-    # 测试直接REST API调用
+    Args:
+        client: HTTP客户端
+        symbol: 要测试的币种
+    
+    Returns:
+        [(日志级别, 日志消息), ...]
+    """
+    logs = []
     try:
-        import httpx
-        import traceback
-        client = httpx.AsyncClient(timeout=10.0)
-        
-        logger.info("尝试直接调用Hyperliquid REST API获取资金费率...")
-        url = "https://api.hyperliquid.xyz/info"
-        payload = {"type": "metaAndAssetCtxs"}
-        
-        response = await client.post(url, json=payload)
+        logs.append((logging.INFO, "尝试直接调用Hyperliquid REST API获取资金费率..."))
+        response = await client.post(_INFO_URL, content=_META_PAYLOAD, headers=_JSON_HEADERS)
         
         if response.status_code == 200:
-            logger.info(f"REST API请求成功，状态码: {response.status_code}")
+            logs.append((logging.INFO, f"REST API请求成功，状态码: {response.status_code}"))
             
             # 解析响应并查找特定币种
-            data = response.json()
+            data = orjson.loads(response.content)
             
             # 记录响应格式
-            logger.debug(f"响应数据类型: {type(data)}")
-            if isinstance(data, dict):
-                logger.debug(f"响应数据键: {data.keys()}")
-            elif isinstance(data, list):
-                logger.debug(f"响应数据是列表，长度: {len(data)}")
-                if len(data) > 0:
-                    logger.debug(f"第一项类型: {type(data[0])}")
-                    if isinstance(data[0], dict):
-                        logger.debug(f"第一项键: {data[0].keys()}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logs.append((logging.DEBUG, f"响应数据类型: {type(data)}"))
+                if isinstance(data, dict):
+                    logs.append((logging.DEBUG, f"响应数据键: {data.keys()}"))
+                elif isinstance(data, list):
+                    logs.append((logging.DEBUG, f"响应数据是列表，长度: {len(data)}"))
+                    if len(data) > 0:
+                        logs.append((logging.DEBUG, f"第一项类型: {type(data[0])}"))
+                        if isinstance(data[0], dict):
+                            logs.append((logging.DEBUG, f"第一项键: {data[0].keys()}"))
             
             # 尝试以不同格式解析
             universe = []
@@ -118,7 +114,7 @@ async def test_hyperliquid_api(config_path: str, symbol: str = "BTC"):
             if isinstance(data, dict) and "universe" in data and "assetCtxs" in data:
                 universe = data["universe"]
                 asset_ctxs = data["assetCtxs"]
-                logger.info("使用字典格式解析API响应")
+                logs.append((logging.INFO, "使用字典格式解析API响应"))
             # 检查数据是否为列表类型，且有两个元素
             elif isinstance(data, list) and len(data) >= 2:
                 # 假设第一个元素是universe，第二个元素是assetCtxs
@@ -126,89 +122,181 @@ async def test_hyperliquid_api(config_path: str, symbol: str = "BTC"):
                     universe = data[0]
                 if len(data) > 1 and isinstance(data[1], list):
                     asset_ctxs = data[1]
-                logger.info("使用列表格式解析API响应")
+                logs.append((logging.INFO, "使用列表格式解析API响应"))
             
-            logger.info(f"获取到{len(universe)}个币种信息")
+            logs.append((logging.INFO, f"获取到{len(universe)}个币种信息"))
             
-            # 查找特定币种
-            symbol_idx = None
+            # 单次遍历收集所有币种名称及其索引
+            all_coins = []
+            name_to_idx = {}
             for i, coin in enumerate(universe):
-                coin_name = None
                 if isinstance(coin, dict) and "name" in coin:
-                    coin_name = coin.get("name")
+                    coin_name = coin["name"]
                 elif isinstance(coin, str):
                     coin_name = coin
-                
-                if coin_name == symbol:
-                    symbol_idx = i
-                    break
+                else:
+                    continue
+                all_coins.append(coin_name)
+                name_to_idx.setdefault(coin_name, i)
+            
+            # 查找特定币种
+            symbol_idx = name_to_idx.get(symbol)
             
             if symbol_idx is not None and symbol_idx < len(asset_ctxs):
                 asset_ctx = asset_ctxs[symbol_idx]
-                logger.info(f"找到{symbol}的资产上下文: {json.dumps(asset_ctx, indent=2)}")
+                logs.append((logging.INFO, f"找到{symbol}的资产上下文: {orjson.dumps(asset_ctx, option=orjson.OPT_INDENT_2).decode()}"))
                 
                 # 检查是否存在资金费率字段
                 if isinstance(asset_ctx, dict) and "funding" in asset_ctx:
-                    logger.info(f"{symbol}的资金费率: {asset_ctx['funding']}")
+                    logs.append((logging.INFO, f"{symbol}的资金费率: {asset_ctx['funding']}"))
                 else:
-                    logger.warning(f"{symbol}的资产上下文中不存在资金费率字段")
+                    logs.append((logging.WARNING, f"{symbol}的资产上下文中不存在资金费率字段"))
             else:
-                logger.warning(f"在API响应中未找到{symbol}的资产上下文")
+                logs.append((logging.WARNING, f"在API响应中未找到{symbol}的资产上下文"))
                 
             # 打印所有币种名称以供参考
-            all_coins = []
-            for coin in universe:
-                if isinstance(coin, dict) and "name" in coin:
-                    all_coins.append(coin.get("name"))
-                elif isinstance(coin, str):
-                    all_coins.append(coin)
-            
-            logger.info(f"所有可用币种: {', '.join(all_coins)}")
+            logs.append((logging.INFO, f"所有可用币种: {', '.join(all_coins)}"))
         else:
-            logger.error(f"REST API请求失败，状态码: {response.status_code}")
-        
-        await client.aclose()
+            logs.append((logging.ERROR, f"REST API请求失败，状态码: {response.status_code}"))
     except Exception as e:
-        logger.error(f"直接调用REST API失败: {e}")
-        import traceback
-        logger.debug(f"错误详情: {traceback.format_exc()}")
+        logs.append((logging.ERROR, f"直接调用REST API失败: {e}"))
+        if logger.isEnabledFor(logging.DEBUG):
+            logs.append((logging.DEBUG, f"错误详情: {traceback.format_exc()}"))
+    return logs
+
+async def _do_sdk_funding(api, symbol: str) -> List[Tuple[int, str]]:
+    """
+    通过HyperliquidAPI获取资金费率
     
-    # 测试SDK方法
+    Args:
+        api: HyperliquidAPI实例
+        symbol: 要测试的币种
+    
+    Returns:
+        [(日志级别, 日志消息), ...]
+    """
+    logs = []
     try:
-        logger.info(f"尝试通过SDK获取{symbol}的资金费率...")
+        logs.append((logging.INFO, f"尝试通过SDK获取{symbol}的资金费率..."))
         
         funding_rate = await api.get_funding_rate(symbol)
         
         if funding_rate is not None:
-            logger.info(f"成功获取到{symbol}的资金费率: {funding_rate}")
+            logs.append((logging.INFO, f"成功获取到{symbol}的资金费率: {funding_rate}"))
         else:
-            logger.warning(f"获取{symbol}的资金费率失败，返回None")
+            logs.append((logging.WARNING, f"获取{symbol}的资金费率失败，返回None"))
     except Exception as e:
-        logger.error(f"通过SDK获取资金费率失败: {e}")
-        logger.debug(f"错误详情: {traceback.format_exc()}")
+        logs.append((logging.ERROR, f"通过SDK获取资金费率失败: {e}"))
+        if logger.isEnabledFor(logging.DEBUG):
+            logs.append((logging.DEBUG, f"错误详情: {traceback.format_exc()}"))
+    return logs
+
+async def _do_ws_price(api, symbol: str) -> List[Tuple[int, str]]:
+    """
+    启动WebSocket价格订阅并获取价格
+    
+    Args:
+        api: HyperliquidAPI实例
+        symbol: 要测试的币种
     
-    # 测试获取价格
+    Returns:
+        [(日志级别, 日志消息), ...]
+    """
+    logs = []
     try:
-        logger.info(f"尝试获取{symbol}的价格...")
+        logs.append((logging.INFO, f"尝试获取{symbol}的价格..."))
         
         # 先启动WebSocket连接
-        logger.info("启动WebSocket价格连接...")
+        logs.append((logging.INFO, "启动WebSocket价格连接..."))
         await api.start_ws_price_stream()
         
-        # 等待一段时间让WebSocket连接建立并接收数据
-        logger.info("等待5秒以接收价格数据...")
-        await asyncio.sleep(5)
+        # 收到首个报价即继续，最多等待5秒
+        logs.append((logging.INFO, "等待接收价格数据（最多5秒）..."))
+        if not await api.wait_for_price(symbol, timeout=5.0):
+            logs.append((logging.WARNING, "WS未在5秒内收到价格"))
         
         # 获取价格
         price = await api.get_price(symbol)
         
         if price is not None:
-            logger.info(f"成功获取到{symbol}的价格: {price}")
+            logs.append((logging.INFO, f"成功获取到{symbol}的价格: {price}"))
         else:
-            logger.warning(f"获取{symbol}的价格失败，返回None")
+            logs.append((logging.WARNING, f"获取{symbol}的价格失败，返回None"))
+    except Exception as e:
+        logs.append((logging.ERROR, f"获取价格失败: {e}"))
+        if logger.isEnabledFor(logging.DEBUG):
+            logs.append((logging.DEBUG, f"错误详情: {traceback.format_exc()}"))
+    return logs
+
+async def test_hyperliquid_api(config_path: str, symbol: str = "BTC"):
+    """
+    测试Hyperliquid API连接和资金费率获取
+    
+    Args:
+        config_path: 配置文件路径
+        symbol: 要测试的币种
+    """
+    # 打印诊断头部
+    logger.info("=" * 50)
+    logger.info("Hyperliquid API连接和资金费率获取诊断工具")
+    logger.info("=" * 50)
+    
+    # 加载配置
+    try:
+        with open(config_path, 'r') as f:
+            config = yaml.load(f, Loader=YamlLoader)
+        logger.info(f"已成功加载配置文件: {config_path}")
+    except Exception as e:
+        logger.error(f"加载配置文件失败: {e}")
+        return
+    
+    # 提取Hyperliquid API凭证
+    hl_api_key = config.get('exchanges', {}).get('hyperliquid', {}).get('api_key')
+    hl_api_secret = config.get('exchanges', {}).get('hyperliquid', {}).get('api_secret')
+    
+    if not hl_api_key or not hl_api_secret:
+        logger.error("配置文件中未找到Hyperliquid API凭证")
+        return
+    
+    logger.info(f"已找到Hyperliquid API凭证，钱包地址前缀: {hl_api_key[:10]}...")
+    
+    # 导入Hyperliquid API
+    try:
+        from funding_arbitrage_bot.exchanges.hyperliquid_api import HyperliquidAPI
+        logger.info("已成功导入HyperliquidAPI类")
+    except ImportError:
+        logger.error("导入HyperliquidAPI类失败，请确保您在正确的目录中运行此脚本")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("导入错误详情: %s", traceback.format_exc())
+        return
+    
+    # 创建API实例
+    try:
+        api = HyperliquidAPI(
+            api_key=hl_api_key,
+            api_secret=hl_api_secret,
+            logger=logger,
+            config=config
+        )
+        logger.info("已成功创建HyperliquidAPI实例")
     except Exception as e:
-        logger.error(f"获取价格失败: {e}")
-        logger.debug(f"错误详情: {traceback.format_exc()}")
+        logger.error(f"创建HyperliquidAPI实例失败: {e}")
+        return
+    
+    # REST调用、SDK资金费率和WebSocket价格三项测试互相独立，并发执行
+    # 各项测试的日志先缓存，全部完成后按固定顺序输出
+    results = await asyncio.gather(
+        _do_rest_probe(_get_client(), symbol),
+        _do_sdk_funding(api, symbol),
+        _do_ws_price(api, symbol),
+        return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            logger.error(f"诊断任务异常: {result}")
+            continue
+        for level, message in result:
+            logger.log(level, message)
     
     # 清理资源
     try:
@@ -220,6 +308,19 @@ async def test_hyperliquid_api(config_path: str, symbol: str = "BTC"):
     logger.info("诊断完成")
     logger.info("=" * 50)
 
+async def _run(config_path: str, symbol: str):
+    """
+    运行诊断，结束后关闭共享的HTTP客户端
+    
+    Args:
+        config_path: 配置文件路径
+        symbol: 要测试的币种
+    """
+    try:
+        await test_hyperliquid_api(config_path, symbol)
+    finally:
+        await _close_client()
+
 def main():
     """命令行入口函数"""
     parser = argparse.ArgumentParser(description='Hyperliquid API诊断工具')
@@ -237,7 +338,9 @@ def main():
         sys.exit(1)
     
     # 运行异步测试函数
-    asyncio.run(test_hyperliquid_api(args.config, args.symbol))
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    asyncio.run(_run(args.config, args.symbol))
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file
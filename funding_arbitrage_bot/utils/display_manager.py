@@ -9,9 +9,12 @@
 import os
 import sys
 import time
+import heapq
 import logging
-from typing import Dict, List, Optional
-from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from rich.console import Console
 from rich.table import Table
 from rich.live import Live
@@ -19,37 +22,79 @@ from rich.panel import Panel
 from rich.text import Text
 from rich import box
 
+# 市场数据表格的列定义: (标题, 样式, 对齐方式)
+MARKET_COLUMNS = (
+    ("币种", "cyan", "center"),
+    ("BP价格", "green", "right"),
+    ("HL价格", "green", "right"),
+    ("价格差%", "yellow", "right"),
+    ("BP费率(8h)", "blue", "right"),
+    ("HL原始(1h)", "blue", "right"),
+    ("HL调整(8h)", "blue", "right"),
+    ("费率差%", "magenta", "right"),
+    ("总滑点%", "red", "right"),
+    ("BP方向", "red", "center"),
+    ("HL方向", "red", "center"),
+)
+
+# 持仓方向显示文本
+POSITION_SIDE_LABELS = {"BUY": "多", "SELL": "空"}
+
+class _MarketRow(NamedTuple):
+    """市场数据表格的一行"""
+    funding_diff_abs: float  # 资金费率差的绝对值，用于排序
+    cells: Tuple[str, ...]  # 单元格文本
+
+def _fmt(value, spec: str, default: str) -> str:
+    """
+    格式化数值单元格
+    
+    Args:
+        value: 数值，可能为None
+        spec: 格式说明，如".2f"
+        default: 值为None时显示的文本
+    
+    Returns:
+        格式化后的文本
+    """
+    return default if value is None else format(value, spec)
+
 class DisplayManager:
     """显示管理类，负责管理终端显示"""
     
-    def __init__(self, logger: Optional[logging.Logger] = None):
+    def __init__(self, logger: Optional[logging.Logger] = None, max_rows: int = 40):
         """
         初始化显示管理器
         
         Args:
             logger: 日志记录器
+            max_rows: 市场数据表格最多显示的行数（按资金费率差排序取前N行）
         """
         self.logger = logger or logging.getLogger(__name__)
+        self.max_rows = max_rows
         # 使用系统输出文件
         self.console = Console(file=sys.__stdout__)
         self.current_table = None  # 保存当前表格的引用
         self.last_update_time = time.time()
-        self.order_stats = {
-            "total_orders": 0,
-            "successful_orders": 0,
-            "failed_orders": 0,
-            "last_order_time": None,
-            "last_order_message": None
-        }
         
-        # 测试直接输出
-        print("初始化DisplayManager", file=sys.__stdout__)
+        # 订单统计，只做整数自增和属性赋值，渲染时一次性读取快照
+        self._total_orders = 0
+        self._successful_orders = 0
+        self._failed_orders = 0
+        self._last_order_time = None  # 时间戳
+        self._last_order_message = None
         
-        # 创建Live显示上下文
+        # 表格构建和终端输出在单独的渲染线程中进行，不阻塞事件循环
+        self._render_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="display-render")
+        self._render_lock = threading.Lock()
+        self._pending_render = None  # 待渲染的(表格行, 订单统计快照)，只保留最新一份
+        self._render_scheduled = False
+        self._stopped = False  # stop()之后不再提交渲染
+        
+        # 创建Live显示上下文，只在数据更新时刷新，不做定时重绘
         self.live = Live(
             console=self.console,
-            refresh_per_second=4,  # 增加刷新率以使表格更新更流畅
-            auto_refresh=True,
+            auto_refresh=False,
             transient=False  # 确保表格保持在屏幕上
         )
         
@@ -67,30 +112,34 @@ class DisplayManager:
         
         # 启动Live显示
         try:
-            print("开始启动Live显示...", file=sys.__stdout__)
-            self.live.start(self.current_table)
-            print("Live显示已启动", file=sys.__stdout__)
+            self.live.update(self.current_table)
+            self.live.start(refresh=True)
+            self.logger.debug("Live显示已启动")
         except Exception as e:
-            print(f"启动Live显示出错: {e}", file=sys.__stdout__)
+            self.logger.error(f"启动Live显示出错: {e}")
             raise
         
     def stop(self):
         """停止显示"""
+        with self._render_lock:
+            self._stopped = True
+            self._pending_render = None
         try:
-            print("正在停止Live显示...", file=sys.__stdout__)
+            # 等待正在进行的渲染完成后再停止Live显示
+            self._render_executor.shutdown(wait=True)
             self.live.stop()
-            print("Live显示已停止", file=sys.__stdout__)
+            self.logger.debug("Live显示已停止")
         except Exception as e:
-            print(f"停止Live显示出错: {e}", file=sys.__stdout__)
+            self.logger.error(f"停止Live显示出错: {e}")
         
-    def update_market_data(self, data: Dict[str, Dict]):
+    @staticmethod
+    def _new_market_table() -> Table:
         """
-        更新市场数据显示
+        创建带有列定义的空市场数据表格
         
-        Args:
-            data: 市场数据字典
+        Returns:
+            市场数据表格
         """
-        # 创建市场数据表格
         table = Table(
             title="市场数据",
             box=box.ROUNDED,
@@ -98,149 +147,207 @@ class DisplayManager:
             header_style="bold white",
             title_style="bold white"
         )
+        for header, style, justify in MARKET_COLUMNS:
+            table.add_column(header, style=style, justify=justify)
+        return table
+    
+    def _slippage_from_analysis(
+        self, symbol: str, liquidity_analysis: Dict, bp_funding, adjusted_hl_funding, debug_enabled: bool
+    ) -> Optional[float]:
+        """
+        市场数据中没有总滑点时，从流动性分析结果中计算
+        
+        Args:
+            symbol: 币种
+            liquidity_analysis: 流动性分析结果
+            bp_funding: Backpack资金费率
+            adjusted_hl_funding: 调整为8小时的Hyperliquid资金费率
+            debug_enabled: 是否输出调试日志
+        
+        Returns:
+            总滑点，无法计算时返回None
+        """
+        if debug_enabled:
+            self.logger.debug("%s的流动性分析数据键: %s", symbol, list(liquidity_analysis.keys()) if liquidity_analysis else 'None')
+        
+        if not liquidity_analysis:
+            return None
         
-        # 添加列
-        table.add_column("币种", style="cyan", justify="center")
-        table.add_column("BP价格", style="green", justify="right")
-        table.add_column("HL价格", style="green", justify="right")
-        table.add_column("价格差%", style="yellow", justify="right")
-        table.add_column("BP费率(8h)", style="blue", justify="right")
-        table.add_column("HL原始(1h)", style="blue", justify="right")
-        table.add_column("HL调整(8h)", style="blue", justify="right")
-        table.add_column("费率差%", style="magenta", justify="right")
-        table.add_column("总滑点%", style="red", justify="right")
-        table.add_column("BP方向", style="red", justify="center")
-        table.add_column("HL方向", style="red", justify="center")
+        # 确定做多和做空的交易所
+        if bp_funding and adjusted_hl_funding:
+            long_exchange = "hyperliquid" if bp_funding > adjusted_hl_funding else "backpack"
+            short_exchange = "backpack" if long_exchange == "hyperliquid" else "hyperliquid"
+        else:
+            # 默认设置
+            long_exchange = "hyperliquid"
+            short_exchange = "backpack"
+        
+        # 提取滑点信息
+        long_slippage = liquidity_analysis.get(long_exchange, {}).get("bid_slippage_pct", 0)
+        short_slippage = liquidity_analysis.get(short_exchange, {}).get("ask_slippage_pct", 0)
+        
+        if long_slippage is None or short_slippage is None:
+            return None
+        
+        total_slippage = long_slippage + short_slippage
+        if debug_enabled:
+            self.logger.debug("%s的总滑点计算: %s + %s = %s", symbol, long_slippage, short_slippage, total_slippage)
+        return total_slippage
+    
+    def update_market_data(self, data: Dict[str, Dict]):
+        """
+        更新市场数据显示
+        
+        在调用线程中整理表格行数据，表格构建和终端渲染交给渲染线程，
+        避免阻塞事件循环。上一次渲染未完成时只保留最新的一份数据。
+        
+        Args:
+            data: 市场数据字典
+        """
+        if self._stopped:
+            return
         
         try:
-            # 计数有效数据
-            valid_data_count = 0
+            rows, valid_data_count = self._build_market_rows(data)
             
-            # 记录市场数据处理
-            self.logger.debug(f"市场数据字典键: {list(data.keys())}")
+            # 读取订单统计快照
+            stats = (
+                self._total_orders,
+                self._successful_orders,
+                self._failed_orders,
+                self._last_order_time,
+                self._last_order_message,
+            )
             
-            # 创建数据行列表，稍后按资金费率差的绝对值排序
-            rows_data = []
+            self.last_update_time = time.time()
+            self.logger.debug("更新表格中，包含%d个有效数据", valid_data_count)
             
-            # 填充数据行
-            for symbol, symbol_data in data.items():
-                bp_data = symbol_data.get("backpack", {})
-                hl_data = symbol_data.get("hyperliquid", {})
-                
-                if not isinstance(bp_data, dict):
-                    self.logger.warning(f"BP数据格式错误: {bp_data}")
-                    bp_data = {"price": None, "funding_rate": None}
-                    
-                if not isinstance(hl_data, dict):
-                    self.logger.warning(f"HL数据格式错误: {hl_data}")
-                    hl_data = {"price": None, "funding_rate": None}
-                
-                # 获取价格，确保数据有效
-                bp_price = bp_data.get("price")
-                hl_price = hl_data.get("price")
-                
-                if bp_price is not None or hl_price is not None:
-                    valid_data_count += 1
-                
-                # 计算价格差
-                if bp_price and hl_price:
-                    price_diff = (bp_price - hl_price) / hl_price * 100
-                else:
-                    price_diff = 0
-                    
-                # 计算资金费率差
-                bp_funding = bp_data.get("funding_rate")
-                hl_funding = hl_data.get("funding_rate")
-                adjusted_hl_funding = hl_data.get("adjusted_funding_rate")  # 直接使用存储的调整后资金费率
-                
-                # 计算调整后的资金费率差
-                if bp_funding is not None and adjusted_hl_funding is not None:
-                    funding_diff = (bp_funding - adjusted_hl_funding) * 100
-                else:
-                    funding_diff = 0
-                
-                # 计算资金费率差的绝对值用于排序
-                funding_diff_abs = abs(funding_diff)
-                
-                # 获取滑点信息，并记录当前符号所有可用键
-                self.logger.debug(f"{symbol}的市场数据键: {list(symbol_data.keys())}")
-                total_slippage = symbol_data.get("total_slippage")
-                
-                # 记录滑点获取情况
-                self.logger.debug(f"获取{symbol}的总滑点: {total_slippage}")
-                
-                if total_slippage is None:
-                    # 尝试从流动性分析中获取滑点信息
-                    liquidity_analysis = symbol_data.get("liquidity_analysis", {})
-                    self.logger.debug(f"{symbol}的流动性分析数据键: {list(liquidity_analysis.keys()) if liquidity_analysis else 'None'}")
-                    
-                    if liquidity_analysis:
-                        # 确定做多和做空的交易所
-                        if bp_funding and adjusted_hl_funding:
-                            long_exchange = "hyperliquid" if bp_funding > adjusted_hl_funding else "backpack"
-                            short_exchange = "backpack" if long_exchange == "hyperliquid" else "hyperliquid"
-                        else:
-                            # 默认设置
-                            long_exchange = "hyperliquid"
-                            short_exchange = "backpack"
-                            
-                        # 提取交易所的流动性分析数据
-                        long_exchange_data = liquidity_analysis.get(long_exchange, {})
-                        short_exchange_data = liquidity_analysis.get(short_exchange, {})
-                        
-                        self.logger.debug(f"{symbol}的{long_exchange}流动性分析键: {list(long_exchange_data.keys()) if long_exchange_data else 'None'}")
-                        self.logger.debug(f"{symbol}的{short_exchange}流动性分析键: {list(short_exchange_data.keys()) if short_exchange_data else 'None'}")
-                        
-                        # 提取滑点信息
-                        long_slippage = long_exchange_data.get("bid_slippage_pct", 0)
-                        short_slippage = short_exchange_data.get("ask_slippage_pct", 0)
-                        
-                        # 计算总滑点
-                        if long_slippage is not None and short_slippage is not None:
-                            total_slippage = long_slippage + short_slippage
-                            self.logger.debug(f"{symbol}的总滑点计算: {long_slippage} + {short_slippage} = {total_slippage}")
-                
-                # 获取持仓信息（如果存在）
-                bp_position_side = symbol_data.get("bp_position_side", None)
-                hl_position_side = symbol_data.get("hl_position_side", None)
+            with self._render_lock:
+                if self._stopped:
+                    return
+                self._pending_render = (rows, stats)
+                if self._render_scheduled:
+                    return
+                self._render_scheduled = True
+            try:
+                self._render_executor.submit(self._render_worker)
+            except Exception:
+                # 提交失败时复位调度标记，否则后续更新都会以为已有渲染在进行
+                with self._render_lock:
+                    self._render_scheduled = False
+                raise
+            
+        except Exception as e:
+            self.logger.error(f"更新表格显示出错: {e}")
+            # 出错也不中断程序
+    
+    def _build_market_rows(self, data: Dict[str, Dict]) -> Tuple[List[Tuple[str, ...]], int]:
+        """
+        整理市场数据表格的行
+        
+        Args:
+            data: 市场数据字典
+        
+        Returns:
+            (按资金费率差绝对值降序的前max_rows行单元格文本, 有效数据数量)
+        """
+        debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+        
+        # 计数有效数据
+        valid_data_count = 0
+        
+        # 记录市场数据处理
+        if debug_enabled:
+            self.logger.debug("市场数据字典键: %s", list(data.keys()))
+        
+        # 每行保存排序值和单元格文本，稍后按资金费率差的绝对值排序
+        rows = []
+        
+        # 填充数据行
+        for symbol, symbol_data in data.items():
+            bp_data = symbol_data.get("backpack", {})
+            hl_data = symbol_data.get("hyperliquid", {})
+            
+            if not isinstance(bp_data, dict):
+                self.logger.warning(f"BP数据格式错误: {bp_data}")
+                bp_data = {}
                 
-                # 存储行数据和排序值
-                row_data = {
-                    "symbol": symbol,
-                    "bp_price": bp_price,
-                    "hl_price": hl_price,
-                    "price_diff": price_diff,
-                    "bp_funding": bp_funding,
-                    "hl_funding": hl_funding,
-                    "adjusted_hl_funding": adjusted_hl_funding,
-                    "funding_diff": funding_diff,
-                    "funding_diff_abs": funding_diff_abs,  # 用于排序的绝对值
-                    "total_slippage": total_slippage,
-                    "has_position": symbol_data.get("position"),
-                    "bp_position_side": bp_position_side,
-                    "hl_position_side": hl_position_side
-                }
-                rows_data.append(row_data)
+            if not isinstance(hl_data, dict):
+                self.logger.warning(f"HL数据格式错误: {hl_data}")
+                hl_data = {}
+            
+            # 获取价格，确保数据有效
+            bp_price = bp_data.get("price")
+            hl_price = hl_data.get("price")
             
-            # 按资金费率差的绝对值排序（降序）
-            sorted_rows = sorted(rows_data, key=lambda x: x["funding_diff_abs"], reverse=True)
+            if bp_price is not None or hl_price is not None:
+                valid_data_count += 1
+            
+            # 计算资金费率差
+            bp_funding = bp_data.get("funding_rate")
+            hl_funding = hl_data.get("funding_rate")
+            adjusted_hl_funding = hl_data.get("adjusted_funding_rate")  # 直接使用存储的调整后资金费率
+            
+            # 计算调整后的资金费率差
+            if bp_funding is not None and adjusted_hl_funding is not None:
+                funding_diff = (bp_funding - adjusted_hl_funding) * 100
+                funding_diff_text = f"{funding_diff:+.6f}"
+            else:
+                funding_diff = 0
+                funding_diff_text = "0.000000"
             
-            # 将排序后的数据添加到表格
-            for row in sorted_rows:
-                table.add_row(
-                    row["symbol"],
-                    f"{row['bp_price']:.2f}" if row['bp_price'] is not None else "N/A",
-                    f"{row['hl_price']:.2f}" if row['hl_price'] is not None else "N/A",
-                    f"{row['price_diff']:+.4f}" if row['bp_price'] and row['hl_price'] else "N/A",
-                    f"{row['bp_funding']:.6f}" if row['bp_funding'] is not None else "0.000000",
-                    f"{row['hl_funding']:.6f}" if row['hl_funding'] is not None else "0.000000",
-                    f"{row['adjusted_hl_funding']:.6f}" if row['adjusted_hl_funding'] is not None else "0.000000",
-                    f"{row['funding_diff']:+.6f}" if row['bp_funding'] is not None and row['adjusted_hl_funding'] is not None else "0.000000",
-                    f"{row['total_slippage']:.4f}" if row['total_slippage'] is not None else "N/A",
-                    "多" if row['bp_position_side'] == "BUY" else "空" if row['bp_position_side'] == "SELL" else "-",
-                    "多" if row['hl_position_side'] == "BUY" else "空" if row['hl_position_side'] == "SELL" else "-"
+            # 获取滑点信息
+            total_slippage = symbol_data.get("total_slippage")
+            if debug_enabled:
+                self.logger.debug("%s的市场数据键: %s, 总滑点: %s", symbol, list(symbol_data.keys()), total_slippage)
+            
+            if total_slippage is None:
+                total_slippage = self._slippage_from_analysis(
+                    symbol, symbol_data.get("liquidity_analysis", {}), bp_funding, adjusted_hl_funding, debug_enabled
                 )
+            
+            rows.append(_MarketRow(abs(funding_diff), (
+                symbol,
+                _fmt(bp_price, ".2f", "N/A"),
+                _fmt(hl_price, ".2f", "N/A"),
+                f"{(bp_price - hl_price) / hl_price * 100:+.4f}" if bp_price and hl_price else "N/A",
+                _fmt(bp_funding, ".6f", "0.000000"),
+                _fmt(hl_funding, ".6f", "0.000000"),
+                _fmt(adjusted_hl_funding, ".6f", "0.000000"),
+                funding_diff_text,
+                _fmt(total_slippage, ".4f", "N/A"),
+                POSITION_SIDE_LABELS.get(symbol_data.get("bp_position_side"), "-"),
+                POSITION_SIDE_LABELS.get(symbol_data.get("hl_position_side"), "-")
+            )))
+        
+        # 只取资金费率差绝对值最大的前max_rows行（降序）
+        top_rows = [row.cells for row in heapq.nlargest(self.max_rows, rows, key=attrgetter("funding_diff_abs"))]
+        return top_rows, valid_data_count
+    
+    def _render_worker(self):
+        """渲染线程：持续渲染最新的待渲染数据，直到没有新数据"""
+        while True:
+            with self._render_lock:
+                job = self._pending_render
+                self._pending_render = None
+                if job is None:
+                    self._render_scheduled = False
+                    return
+            self._render(*job)
+    
+    def _render(self, rows: List[Tuple[str, ...]], stats: Tuple):
+        """
+        构建表格并刷新Live显示，在渲染线程中执行
         
+        Args:
+            rows: 市场数据表格的行
+            stats: 订单统计快照(总订单数, 成功订单, 失败订单, 最近订单时间, 最近订单消息)
+        """
+        try:
+            table = self._new_market_table()
+            for cells in rows:
+                table.add_row(*cells)
+            
             # 创建订单统计信息表格
             stats_table = Table(
                 title="订单统计信息",
@@ -252,15 +359,17 @@ class DisplayManager:
             stats_table.add_column("项目", style="cyan")
             stats_table.add_column("数值", style="yellow")
             
+            total_orders, successful_orders, failed_orders, last_order_time, last_order_message = stats
+            
             # 添加统计信息
-            stats_table.add_row("总订单数", str(self.order_stats["total_orders"]))
-            stats_table.add_row("成功订单", str(self.order_stats["successful_orders"]))
-            stats_table.add_row("失败订单", str(self.order_stats["failed_orders"]))
+            stats_table.add_row("总订单数", str(total_orders))
+            stats_table.add_row("成功订单", str(successful_orders))
+            stats_table.add_row("失败订单", str(failed_orders))
             
-            last_time = "无" if not self.order_stats["last_order_time"] else self.order_stats["last_order_time"].strftime("%H:%M:%S")
+            last_time = "无" if not last_order_time else time.strftime("%H:%M:%S", time.localtime(last_order_time))
             stats_table.add_row("最近订单时间", last_time)
             
-            last_msg = "无" if not self.order_stats["last_order_message"] else self.order_stats["last_order_message"]
+            last_msg = "无" if not last_order_message else last_order_message
             stats_table.add_row("最近订单消息", last_msg[:50] + "..." if last_msg and len(last_msg) > 50 else last_msg)
             
             # 创建组合布局
@@ -268,33 +377,12 @@ class DisplayManager:
             main_table.add_row(table)
             main_table.add_row(Panel(stats_table, border_style="blue"))
             
-            # 记录调试信息
-            now = time.time()
-            self.last_update_time = now
-            
-            # 保存并直接更新表格
+            # 保存并刷新表格
             self.current_table = main_table
-            
-            self.logger.debug(f"更新表格中，包含{valid_data_count}个有效数据")
-            
-            # 尝试使用直接的控制台渲染
-            try:
-                self.live.update(self.current_table)
-                self.logger.debug("表格已更新")
-            except Exception as e:
-                self.logger.error(f"表格更新出错: {e}")
-                
-                # 如果live更新失败，尝试直接渲染
-                try:
-                    print("\n" + "-" * 80, file=sys.__stdout__)
-                    self.console.print(self.current_table)
-                    print("-" * 80, file=sys.__stdout__)
-                except Exception as direct_e:
-                    self.logger.error(f"直接渲染表格出错: {direct_e}")
-            
+            self.live.update(self.current_table, refresh=True)
+            self.logger.debug("表格已更新")
         except Exception as e:
-            self.logger.error(f"更新表格显示出错: {e}")
-            # 出错也不中断程序
+            self.logger.error(f"表格更新出错: {e}")
         
     def add_order_message(self, message: str):
         """
@@ -305,18 +393,18 @@ class DisplayManager:
         """
         try:
             # 更新订单统计
-            self.order_stats["total_orders"] += 1
+            self._total_orders += 1
             if "成功" in message or "已完成" in message:
-                self.order_stats["successful_orders"] += 1
+                self._successful_orders += 1
             elif "失败" in message or "错误" in message:
-                self.order_stats["failed_orders"] += 1
+                self._failed_orders += 1
                 
             # 更新最近订单信息
-            self.order_stats["last_order_time"] = datetime.now()
-            self.order_stats["last_order_message"] = message
+            self._last_order_time = time.time()
+            self._last_order_message = message
             
             # 记录到日志
-            self.logger.info(f"订单消息: {message}")
+            self.logger.info("订单消息: %s", message)
         except Exception as e:
             self.logger.error(f"处理订单消息时出错: {e}")
             # 出错也不中断程序
@@ -331,24 +419,22 @@ class DisplayManager:
         """
         try:
             # 更新订单统计
-            self.order_stats["total_orders"] += 1
-            
+            self._total_orders += 1
             if success:
-                self.order_stats["successful_orders"] += 1
-                action_desc = "开仓" if action == "open" else "平仓"
-                self.order_stats["last_order_message"] = f"{action_desc}成功 (持仓变化验证)"
+                self._successful_orders += 1
             else:
-                self.order_stats["failed_orders"] += 1
-                action_desc = "开仓" if action == "open" else "平仓"
-                self.order_stats["last_order_message"] = f"{action_desc}失败 (持仓变化验证)"
-                
-            # 更新最近订单时间
-            self.order_stats["last_order_time"] = datetime.now()
+                self._failed_orders += 1
             
-            # 记录到日志
+            action_desc = "开仓" if action == "open" else "平仓"
             msg = f"{action_desc}{'成功' if success else '失败'} (持仓变化验证)"
-            self.logger.info(f"订单统计更新: {msg}")
+            
+            # 更新最近订单信息
+            self._last_order_time = time.time()
+            self._last_order_message = msg
+            
+            # 记录到日志
+            self.logger.info("订单统计更新: %s", msg)
             
         except Exception as e:
             self.logger.error(f"更新订单统计时出错: {e}")
-            # 出错也不中断程序 
\ No newline at end of file
+            # 出错也不中断程序
@@ -7,6 +7,10 @@
 """
 
 import os
+import sys
+import copy
+import time
+import functools
 import yaml
 import decimal
 from decimal import Decimal
@@ -14,15 +18,32 @@ from typing import Dict, List, Any, Optional, Union, Tuple
 from datetime import datetime
 import logging
 
+# numpy为可选依赖，只有批量计算函数需要
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
-def get_backpack_symbol(symbol):
-    """获取Backpack格式的交易对"""
-    return f"{symbol}_USDC_PERP"
+# 优先使用libyaml的C扩展解析器，未安装时回退到纯Python实现
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
 
+# decimal模块支持的舍入模式，每种模式预先创建一个计算上下文
+_ROUNDING_CONTEXTS = {
+    name: decimal.Context(rounding=getattr(decimal, name))
+    for name in (
+        'ROUND_DOWN', 'ROUND_UP', 'ROUND_FLOOR', 'ROUND_CEILING',
+        'ROUND_HALF_UP', 'ROUND_HALF_DOWN', 'ROUND_HALF_EVEN', 'ROUND_05UP',
+    )
+}
 
-def get_hyperliquid_symbol(symbol):
-    """获取Hyperliquid格式的交易对"""
-    return symbol
+# 各精度对应的quantize指数，按精度索引，与Decimal('0.' + '0' * precision)等价
+_QUANTIZE_EXPS = tuple(Decimal('0.' + '0' * i) for i in range(19))
+
+# 各精度对应的%格式串，按精度索引
+_FMT = tuple("%%.%df" % i for i in range(19))
 
 
 def decimal_adjust(value: float, precision: int, rounding_mode: str = 'ROUND_DOWN') -> float:
@@ -37,14 +58,11 @@ def decimal_adjust(value: float, precision: int, rounding_mode: str = 'ROUND_DOW
     Returns:
         调整后的浮点数
     """
-    if not hasattr(decimal, rounding_mode):
+    context = _ROUNDING_CONTEXTS.get(rounding_mode)
+    if context is None:
         raise ValueError(f"无效的舍入模式: {rounding_mode}")
     
-    rounding = getattr(decimal, rounding_mode)
-    context = decimal.getcontext().copy()
-    context.rounding = rounding
-    
-    quantize_exp = Decimal('0.' + '0' * precision)
+    quantize_exp = _QUANTIZE_EXPS[precision] if 0 <= precision < len(_QUANTIZE_EXPS) else Decimal('0.' + '0' * precision)
     result = Decimal(str(value)).quantize(quantize_exp, context=context)
     
     return float(result)
@@ -52,7 +70,7 @@ def decimal_adjust(value: float, precision: int, rounding_mode: str = 'ROUND_DOW
 
 def safe_get(data: Dict, keys: List[str], default: Any = None) -> Any:
     """
-    安全地从嵌套字典中获取值
+    安全地从嵌套字典中获取值，路径中也可以包含列表索引
     
     Args:
         data: 嵌套字典
@@ -63,18 +81,45 @@ def safe_get(data: Dict, keys: List[str], default: Any = None) -> Any:
         获取到的值，或默认值
     """
     result = data
-    for key in keys:
-        if isinstance(result, dict) and key in result:
+    try:
+        for key in keys:
             result = result[key]
-        else:
-            return default
+    except (KeyError, IndexError, TypeError):
+        return default
     return result
 
 
+@functools.lru_cache(maxsize=8)
+def _load_config_cached(config_path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """
+    解析YAML配置文件，按(路径, 修改时间, 大小)缓存解析结果
+    
+    Args:
+        config_path: 配置文件路径
+        mtime_ns: 文件修改时间（纳秒），仅用作缓存键
+        size: 文件大小，仅用作缓存键
+        
+    Returns:
+        配置字典（缓存对象，调用方不可修改）
+    """
+    # 以二进制方式打开，由libyaml自行解码
+    with open(config_path, 'rb') as file:
+        config = yaml.load(file, Loader=YamlLoader)
+    
+    # 检查TRACE日志级别设置
+    if config.get("logging", {}).get("level", "").upper() == "TRACE":
+        print("警告: 当前版本不支持TRACE日志级别，将使用DEBUG级别替代")
+        config["logging"]["level"] = "DEBUG"
+    
+    return config
+
+
 def load_config(config_path: str) -> Dict[str, Any]:
     """
     加载YAML配置文件
     
+    文件未修改时直接复用缓存的解析结果，返回的是深拷贝，调用方可以自由修改
+    
     Args:
         config_path: 配置文件路径
         
@@ -85,13 +130,12 @@ def load_config(config_path: str) -> Dict[str, Any]:
         FileNotFoundError: 配置文件不存在
         yaml.YAMLError: YAML格式错误
     """
-    if not os.path.exists(config_path):
-        raise FileNotFoundError(f"配置文件不存在: {config_path}")
-        
-    with open(config_path, 'r', encoding='utf-8') as file:
-        config = yaml.safe_load(file)
+    try:
+        st = os.stat(config_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"配置文件不存在: {config_path}") from None
     
-    return config
+    return copy.deepcopy(_load_config_cached(config_path, st.st_mtime_ns, st.st_size))
 
 
 def calculate_funding_diff(bp_funding: float, hl_funding: float) -> Tuple[float, int]:
@@ -108,23 +152,36 @@ def calculate_funding_diff(bp_funding: float, hl_funding: float) -> Tuple[float,
     Returns:
         (资金费率差值, 差值符号(1,-1或0))
     """
-    # 将Hyperliquid的资金费率乘以8，以匹配Backpack的8小时周期
-    adjusted_hl_funding = hl_funding * 8
-    
-    # 计算调整后的差异
-    diff = bp_funding - adjusted_hl_funding
-    
-    # 获取差值符号
-    if diff > 0:
-        sign = 1
-    elif diff < 0:
-        sign = -1
-    else:
-        sign = 0
-        
+    # 将Hyperliquid的资金费率乘以8，以匹配Backpack的8小时周期，并计算调整后的差异
+    diff = bp_funding - hl_funding * 8.0
+    
+    # 获取差值符号(1,-1或0)
+    sign = (diff > 0.0) - (diff < 0.0)
+    
     return abs(diff), sign
 
 
+def calculate_funding_diff_vec(bp_funding, hl_funding) -> Tuple[Any, Any]:
+    """
+    批量计算资金费率差异和差异符号，与calculate_funding_diff逐元素结果一致
+    
+    Args:
+        bp_funding: Backpack资金费率数组（8小时结算）
+        hl_funding: Hyperliquid资金费率数组（1小时结算）
+    
+    Returns:
+        (资金费率差值绝对值数组, 差值符号数组(int8, 1,-1或0))
+    
+    Raises:
+        ImportError: 未安装numpy
+    """
+    if np is None:
+        raise ImportError("calculate_funding_diff_vec需要安装numpy")
+    
+    diff = np.asarray(bp_funding, dtype=np.float64) - np.asarray(hl_funding, dtype=np.float64) * 8.0
+    return np.abs(diff), np.sign(diff).astype(np.int8)
+
+
 def get_symbol_from_exchange_symbol(exchange_symbol: str, exchange_type: str) -> Optional[str]:
     """
     从交易所交易对格式获取基础币种
@@ -138,17 +195,29 @@ def get_symbol_from_exchange_symbol(exchange_symbol: str, exchange_type: str) ->
     """
     if not exchange_symbol:
         return None
-        
-    if exchange_type.lower() == "backpack":
+    return _base_symbol(exchange_symbol, exchange_type.lower())
+
+
+@functools.lru_cache(maxsize=512)
+def _base_symbol(exchange_symbol: str, exchange_type: str) -> Optional[str]:
+    """
+    get_symbol_from_exchange_symbol的缓存实现，exchange_type已转换为小写
+    
+    Args:
+        exchange_symbol: 交易所格式的交易对
+        exchange_type: 小写的交易所类型
+    
+    Returns:
+        基础币种，如果无法转换则返回None
+    """
+    if exchange_type == "backpack":
         # 处理Backpack交易对格式，如"BTC_USDC_PERP"
         if "_" in exchange_symbol:
-            # 打印日志以便调试
-            print(f"转换Backpack交易对: {exchange_symbol}")
             parts = exchange_symbol.split("_")
             if len(parts) > 0:
-                return parts[0]  # 返回第一部分，即基础币种
+                return sys.intern(parts[0])  # 返回第一部分，即基础币种（驻留字符串）
             return None
-    elif exchange_type.lower() == "hyperliquid":
+    elif exchange_type == "hyperliquid":
         # Hyperliquid直接使用币种作为交易对
         return exchange_symbol
     
@@ -156,6 +225,7 @@ def get_symbol_from_exchange_symbol(exchange_symbol: str, exchange_type: str) ->
     return exchange_symbol
 
 
+@functools.lru_cache(maxsize=256)
 def get_hyperliquid_symbol(base_symbol: str) -> str:
     """
     将基础币种名称转换为Hyperliquid交易对格式
@@ -166,9 +236,10 @@ def get_hyperliquid_symbol(base_symbol: str) -> str:
     Returns:
         Hyperliquid格式的交易对名称，如 "BTC"
     """
-    return base_symbol
+    return sys.intern(base_symbol)
 
 
+@functools.lru_cache(maxsize=256)
 def get_backpack_symbol(base_symbol: str) -> str:
     """
     将基础币种名称转换为Backpack交易对格式
@@ -179,7 +250,8 @@ def get_backpack_symbol(base_symbol: str) -> str:
     Returns:
         Backpack格式的交易对名称，如 "BTC_USDC_PERP"
     """
-    return f"{base_symbol}_USDC_PERP"
+    # 驻留字符串，作为字典键时可按指针比较
+    return sys.intern(base_symbol + "_USDC_PERP")
 
 
 def convert_exchange_positions_to_local(
@@ -197,56 +269,63 @@ def convert_exchange_positions_to_local(
         本地持仓格式字典，格式为{"BTC": {"bp_symbol": "BTC_USDC_PERP", "bp_side": "BUY", ...}}
     """
     local_positions = {}
+    now_iso = datetime.now().isoformat()
+    
+    # 新建持仓没有开仓时的资金费率信息，费率记为0.0，差值符号为0
+    def new_position() -> Dict[str, Any]:
+        return {
+            "entry_time": now_iso,
+            "entry_bp_funding": 0.0,
+            "entry_hl_funding": 0.0,
+            "entry_funding_diff_sign": 0
+        }
     
     # 处理Backpack持仓
     for bp_symbol, bp_pos in bp_positions.items():
         base_symbol = get_symbol_from_exchange_symbol(bp_symbol, "backpack")
-        if not base_symbol:
+        if not base_symbol or base_symbol in local_positions:
             continue
-            
-        if base_symbol not in local_positions:
-            local_positions[base_symbol] = {
-                "bp_symbol": bp_symbol,
-                "bp_side": bp_pos["side"],
-                "bp_size": bp_pos["size"],
-                "entry_time": datetime.now().isoformat()
-            }
-    
-    # 处理Hyperliquid持仓
+        
+        pos = local_positions[base_symbol] = new_position()
+        pos["bp_symbol"] = bp_symbol
+        pos["bp_side"] = bp_pos["side"]
+        pos["bp_size"] = bp_pos["size"]
+    
+    # 处理Hyperliquid持仓，已有Backpack持仓时补充Hyperliquid信息
     for hl_symbol, hl_pos in hl_positions.items():
         base_symbol = get_symbol_from_exchange_symbol(hl_symbol, "hyperliquid")
         if not base_symbol:
             continue
-            
-        if base_symbol in local_positions:
-            # 如果已经有Backpack持仓，添加Hyperliquid信息
-            local_positions[base_symbol].update({
-                "hl_symbol": hl_symbol,
-                "hl_side": hl_pos["side"],
-                "hl_size": hl_pos["size"]
-            })
-        else:
-            # 如果只有Hyperliquid持仓
-            local_positions[base_symbol] = {
-                "hl_symbol": hl_symbol,
-                "hl_side": hl_pos["side"],
-                "hl_size": hl_pos["size"],
-                "entry_time": datetime.now().isoformat()
-            }
-    
-    # 填充缺失的资金费率信息
-    for symbol, pos in local_positions.items():
-        if "entry_bp_funding" not in pos:
-            pos["entry_bp_funding"] = 0.0
-        if "entry_hl_funding" not in pos:
-            pos["entry_hl_funding"] = 0.0
-        if "entry_funding_diff_sign" not in pos:
-            diff, sign = calculate_funding_diff(pos["entry_bp_funding"], pos["entry_hl_funding"])
-            pos["entry_funding_diff_sign"] = sign
+        
+        pos = local_positions.get(base_symbol)
+        if pos is None:
+            pos = local_positions[base_symbol] = new_position()
+        pos["hl_symbol"] = hl_symbol
+        pos["hl_side"] = hl_pos["side"]
+        pos["hl_size"] = hl_pos["size"]
     
     return local_positions
 
 
+class _CachedTimeFormatter(logging.Formatter):
+    """时间部分按秒缓存的日志格式化器，同一秒内的日志记录只调用一次strftime"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cached_second = None
+        self._cached_time = ""
+    
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        
+        second = int(record.created)
+        if second != self._cached_second:
+            self._cached_time = time.strftime(self.default_time_format, self.converter(second))
+            self._cached_second = second
+        return self.default_msec_format % (self._cached_time, record.msecs)
+
+
 def configure_logging(
     logger_name: str, 
     log_level: str = "INFO", 
@@ -276,13 +355,12 @@ def configure_logging(
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
     
-    # 配置日志格式
+    # 配置日志格式（处理器不单独设置级别，由日志记录器的级别统一过滤）
     log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    formatter = logging.Formatter(log_format)
+    formatter = _CachedTimeFormatter(log_format)
     
     # 添加控制台处理器
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(level)
     console_handler.setFormatter(formatter)
     logger.addHandler(console_handler)
     
@@ -294,10 +372,12 @@ def configure_logging(
             os.makedirs(log_dir)
             
         file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(level)
         file_handler.setFormatter(formatter)
         logger.addHandler(file_handler)
     
+    # 已有自己的处理器，不再传递给根日志记录器重复处理
+    logger.propagate = False
+    
     # 静音指定的日志记录器（只记录错误）
     if quiet_loggers:
         for logger_name in quiet_loggers:
@@ -331,5 +411,9 @@ def format_number(value: float, precision: int) -> str:
     Returns:
         格式化后的字符串
     """
+    # Decimal经%格式化会先转为float，保留str.format路径以保证精确
+    if 0 <= precision < 19 and not isinstance(value, Decimal):
+        return _FMT[precision] % value
+    
     format_str = f"{{:.{precision}f}}"
-    return format_str.format(value) 
\ No newline at end of file
+    return format_str.format(value)
\ No newline at end of file
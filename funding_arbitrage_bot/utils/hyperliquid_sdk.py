@@ -5,22 +5,70 @@ Hyperliquid SDK包装器
 """
 
 import json
+import logging
 import httpx
 import time
+import asyncio
+import itertools
+import concurrent.futures
+import orjson
+import websockets
 from typing import Dict, List, Tuple, Any, Optional
 from eth_account import Account
-from eth_account.messages import encode_defunct
+from eth_keys import keys
+from eth_utils import keccak
+
+JSON_HEADERS = {"content-type": "application/json"}
+
+# EIP-191 personal_sign 前缀
+EIP191_PREFIX = b"\x19Ethereum Signed Message:\n"
+
+_shared_client = None
+
+def get_client() -> httpx.AsyncClient:
+    """
+    获取模块共享的HTTP客户端
+    
+    所有连接实例复用同一个启用HTTP/2和keep-alive的连接池
+    
+    Returns:
+        共享的httpx.AsyncClient
+    """
+    global _shared_client
+    if _shared_client is None or _shared_client.is_closed:
+        _shared_client = httpx.AsyncClient(
+            timeout=10.0,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+        )
+    return _shared_client
+
+async def close_client():
+    """关闭模块共享的HTTP客户端，应在程序退出前调用"""
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.aclose()
+        _shared_client = None
 
 class HyperliquidBase:
     """Hyperliquid基础连接类"""
     
-    def __init__(self):
+    def __init__(self, logger: Optional[logging.Logger] = None):
+        self.logger = logger or logging.getLogger(__name__)
         self.base_url = "https://api.hyperliquid.xyz"
-        self.http_client = httpx.AsyncClient(timeout=10.0)
+    
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """模块共享的HTTP客户端，每次访问时获取，共享客户端重建后自动使用新实例"""
+        return get_client()
         
     async def close(self):
-        """关闭HTTP连接"""
-        await self.http_client.aclose()
+        """
+        关闭实例
+        
+        HTTP连接池由所有实例共享，这里不关闭，避免影响其他仍在使用的实例；
+        程序退出前应调用close_client()释放连接池
+        """
     
     async def request(self, endpoint: str, method: str = "GET", data: Optional[Dict] = None) -> Dict:
         """
@@ -35,19 +83,120 @@ class HyperliquidBase:
             响应数据
         """
         url = f"{self.base_url}/{endpoint}"
-        print(f"HTTP Request: {method} {url} with data: {json.dumps(data, default=str)}")
+        debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            self.logger.debug("HTTP Request: %s %s body=%s", method, url, orjson.dumps(data, default=str).decode())
         
-        if method.upper() == "GET":
-            response = await self.http_client.get(url, json=data)
-        else:
-            response = await self.http_client.post(url, json=data)
+        # 预先用orjson序列化请求体，避免httpx再用标准库json编码
+        body = orjson.dumps(data) if data is not None else None
+        response = await self.http_client.request(method.upper(), url, content=body, headers=JSON_HEADERS)
         
-        print(f"HTTP Response: {response.status_code} - {response.text[:200]}...")
+        if debug_enabled:
+            # 只解码前200字节用于日志，避免解码整个响应体
+            self.logger.debug(
+                "HTTP Response: %s - %s...", response.status_code, response.content[:200].decode("utf-8", "replace")
+            )
         
         if response.status_code != 200:
-            raise Exception(f"API请求失败，状态码: {response.status_code}, 响应: {response.text}")
+            raise Exception(
+                f"API请求失败，状态码: {response.status_code}, 响应: {response.content[:500].decode('utf-8', 'replace')}"
+            )
+        
+        return orjson.loads(response.content)
+
+class HyperliquidWsTrade:
+    """Hyperliquid WebSocket交易通道，通过单个长连接发送已签名的交易请求"""
+    
+    def __init__(self, ws_url: str = "wss://api.hyperliquid.xyz/ws", timeout: float = 5.0):
+        self.ws_url = ws_url
+        self.timeout = timeout  # 等待交易请求响应的超时时间(秒)
+        self.ws = None
+        self.reader_task = None
+        self._pending = {}  # 请求ID -> 等待响应的Future
+        self._request_ids = itertools.count(1)
+        self._connect_lock = asyncio.Lock()
+    
+    @property
+    def connected(self) -> bool:
+        """WebSocket连接是否可用"""
+        return self.ws is not None and self.ws.open
+    
+    async def connect(self):
+        """建立WebSocket连接并启动响应读取任务"""
+        async with self._connect_lock:
+            if self.connected:
+                return
+            self.ws = await websockets.connect(self.ws_url)
+            self.reader_task = asyncio.create_task(self._reader(self.ws))
+    
+    async def close(self):
+        """关闭WebSocket连接"""
+        if self.ws is not None:
+            await self.ws.close()
+        if self.reader_task:
+            self.reader_task.cancel()
+            self.reader_task = None
+    
+    async def _reader(self, ws):
+        """
+        读取WebSocket响应，按请求ID完成对应的Future
+        
+        Args:
+            ws: WebSocket连接
+        """
+        try:
+            async for message in ws:
+                data = json.loads(message)
+                if data.get("channel") != "post":
+                    continue
+                
+                body = data.get("data", {})
+                future = self._pending.pop(body.get("id"), None)
+                if future is None or future.done():
+                    continue
+                
+                response = body.get("response", {})
+                if response.get("type") == "error":
+                    future.set_exception(Exception(f"WebSocket交易请求失败: {response.get('payload')}"))
+                else:
+                    future.set_result(response.get("payload"))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            if self.ws is ws:
+                self.ws = None
+            # 连接断开时让所有等待中的请求立即失败
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("WebSocket交易通道已断开"))
+            self._pending.clear()
+    
+    async def send_and_wait(self, payload: Dict) -> Dict:
+        """
+        发送已签名的交易请求并等待响应
         
-        return response.json()
+        Args:
+            payload: 签名后的请求数据，与HTTP exchange接口的请求体相同
+        
+        Returns:
+            响应数据，与HTTP exchange接口的返回格式相同
+        """
+        if not self.connected:
+            await self.connect()
+        
+        request_id = next(self._request_ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        
+        try:
+            await self.ws.send(json.dumps({
+                "method": "post",
+                "id": request_id,
+                "request": {"type": "action", "payload": payload}
+            }))
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._pending.pop(request_id, None)
 
 class HyperliquidInfo:
     """Hyperliquid市场信息类"""
@@ -89,8 +238,60 @@ class HyperliquidInfo:
 class HyperliquidMarketData:
     """Hyperliquid市场数据类"""
     
-    def __init__(self, connection: HyperliquidBase):
+    def __init__(self, connection: HyperliquidBase, ctx_ttl: float = 1.0):
         self.connection = connection
+        self.ctx_ttl = ctx_ttl  # metaAndAssetCtxs缓存有效期(秒)
+        self._fundings: Dict[str, float] = {}  # 币种->资金费率
+        self._fundings_ts = float("-inf")  # 上次获取资金费率的时间
+    
+    @staticmethod
+    def _parse_meta(response) -> Tuple[List, List]:
+        """
+        解析metaAndAssetCtxs响应
+        
+        Args:
+            response: API响应，可能是字典或[meta, assetCtxs]列表
+        
+        Returns:
+            (universe列表, 资产上下文列表)
+        """
+        # 检查数据是否为字典类型，有universe和assetCtxs键
+        if isinstance(response, dict):
+            return response.get("universe") or [], response.get("assetCtxs") or []
+        # 检查数据是否为列表类型，第一个元素是meta（或universe列表），第二个元素是assetCtxs
+        if isinstance(response, list) and len(response) >= 2:
+            meta = response[0]
+            if isinstance(meta, dict):
+                universe = meta.get("universe") or []
+            else:
+                universe = meta if isinstance(meta, list) else []
+            asset_contexts = response[1] if isinstance(response[1], list) else []
+            return universe, asset_contexts
+        return [], []
+    
+    async def _refresh_fundings(self) -> Dict[str, float]:
+        """
+        刷新币种到资金费率的映射，在缓存有效期内复用上次的结果
+        
+        Returns:
+            币种到资金费率的映射
+        """
+        if time.monotonic() - self._fundings_ts < self.ctx_ttl:
+            return self._fundings
+        
+        response = await self.connection.request(
+            "info", method="POST", data={"type": "metaAndAssetCtxs"}
+        )
+        universe, asset_contexts = self._parse_meta(response)
+        
+        # 单次遍历建立币种->资金费率映射，之后按币种查找为O(1)
+        self._fundings = {
+            (coin["name"] if type(coin) is dict else coin): float(ctx["funding"])
+            for coin, ctx in zip(universe, asset_contexts)
+            if isinstance(ctx, dict) and "funding" in ctx
+        }
+        self._fundings_ts = time.monotonic()
+        return self._fundings
     
     async def get_funding_rate(self, symbol: str) -> Optional[float]:
         """
@@ -103,47 +304,38 @@ class HyperliquidMarketData:
             资金费率，如果无法获取则返回None
         """
         try:
-            response = await self.connection.request(
-                "info", method="POST", data={"type": "metaAndAssetCtxs"}
-            )
-            
-            # 处理不同格式的响应
-            universe = []
-            asset_contexts = []
-            
-            # 检查数据是否为字典类型，有universe和assetCtxs键
-            if isinstance(response, dict) and "universe" in response and "assetCtxs" in response:
-                universe = response["universe"]
-                asset_contexts = response["assetCtxs"]
-            # 检查数据是否为列表类型，且有两个元素
-            elif isinstance(response, list) and len(response) >= 2:
-                # 假设第一个元素是universe，第二个元素是assetCtxs
-                if isinstance(response[0], list):
-                    universe = response[0]
-                if len(response) > 1 and isinstance(response[1], list):
-                    asset_contexts = response[1]
-            
-            # 查找指定币种的索引
-            idx = None
-            for i, coin in enumerate(universe):
-                coin_name = None
-                if isinstance(coin, dict) and "name" in coin:
-                    coin_name = coin.get("name")
-                elif isinstance(coin, str):
-                    coin_name = coin
-                
-                if coin_name == symbol:
-                    idx = i
-                    break
-            
-            if idx is not None and idx < len(asset_contexts):
-                asset_ctx = asset_contexts[idx]
-                if isinstance(asset_ctx, dict) and "funding" in asset_ctx:
-                    return float(asset_ctx["funding"])
-            
-            return None
+            return (await self._refresh_fundings()).get(symbol)
         except Exception:
             return None
+    
+    async def get_all_funding_rates(self) -> Dict[str, float]:
+        """
+        获取所有币种的资金费率，一次metaAndAssetCtxs请求返回全部数据
+        
+        Returns:
+            币种到资金费率的映射，如 {"BTC": 0.0001}，获取失败时返回空字典
+        """
+        try:
+            return dict(await self._refresh_fundings())
+        except Exception:
+            return {}
+    
+    async def get_funding_rates_bulk(self, symbols: List[str]) -> Dict[str, Optional[float]]:
+        """
+        批量获取资金费率，所有币种共用一次metaAndAssetCtxs请求
+        
+        Args:
+            symbols: 币种列表
+        
+        Returns:
+            币种到资金费率的映射，无法获取的币种值为None
+        """
+        try:
+            fundings = await self._refresh_fundings()
+        except Exception:
+            return {symbol: None for symbol in symbols}
+        
+        return {symbol: fundings.get(symbol) for symbol in symbols}
 
 class HyperliquidUser:
     """Hyperliquid用户类"""
@@ -152,8 +344,11 @@ class HyperliquidUser:
         self.connection = connection
         self.wallet_address = wallet_address
         self.wallet_secret = wallet_secret
+        self._wallet_lower = wallet_address.lower()
         # 创建钱包对象
         self.wallet = Account.from_key(wallet_secret)
+        # 私钥对象只解析一次，签名时直接对摘要签名
+        self._private_key = keys.PrivateKey(bytes(self.wallet.key))
     
     def sign_request(self, action_type: str, data: Dict) -> Dict:
         """
@@ -166,17 +361,17 @@ class HyperliquidUser:
         Returns:
             完整的签名请求
         """
-        # 创建时间戳
-        ts = int(time.time())
+        # 创建毫秒时间戳作为nonce（Hyperliquid的nonce为毫秒精度，秒级时间戳在连续下单时会重复）
+        ts = time.time_ns() // 1_000_000
         
         # 创建待签名的消息（根据Hyperliquid文档格式)
-        message = f"hyperliquid\n{action_type}\n{self.wallet_address.lower()}\n{ts}"
+        message = f"hyperliquid\n{action_type}\n{self._wallet_lower}\n{ts}".encode()
         
-        # 编码消息
-        message_hash = encode_defunct(text=message)
+        # 按EIP-191构造摘要，与encode_defunct + sign_message结果一致
+        digest = keccak(EIP191_PREFIX + str(len(message)).encode() + message)
         
         # 签名
-        signed_message = self.wallet.sign_message(message_hash)
+        signature = self._private_key.sign_msg_hash(digest)
         
         # 构建完整请求
         payload = {
@@ -185,13 +380,13 @@ class HyperliquidUser:
                 "data": data
             },
             "signature": {
-                "r": signed_message.r,
-                "s": signed_message.s,
-                "v": signed_message.v
+                "r": signature.r,
+                "s": signature.s,
+                "v": signature.v + 27
             },
             "nonce": ts,
             "agent": "sdk",
-            "wallet": self.wallet_address.lower()
+            "wallet": self._wallet_lower
         }
         
         return payload
@@ -199,9 +394,19 @@ class HyperliquidUser:
 class HyperliquidExchange:
     """Hyperliquid交易类"""
     
-    def __init__(self, connection: HyperliquidBase, user: HyperliquidUser):
+    def __init__(
+        self,
+        connection: HyperliquidBase,
+        user: HyperliquidUser,
+        ws_trade: Optional[HyperliquidWsTrade] = None,
+        use_ws_trade_api: bool = True
+    ):
         self.connection = connection
         self.user = user
+        self.ws_trade = ws_trade
+        self.use_ws_trade_api = use_ws_trade_api and ws_trade is not None
+        # ECDSA签名是同步的CPU操作，放到线程池执行以免阻塞事件循环
+        self._sign_pool = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="hl-sign")
     
     async def order(self, name: str, is_buy: bool, sz: float, limit_px: float, order_type):
         """
@@ -233,11 +438,23 @@ class HyperliquidExchange:
             "limit_px": limit_px,
             "order_type": processed_order_type,
             "reduce_only": False,
-            "cloid": int(time.time() * 1000)  # 客户端订单ID
+            "cloid": time.time_ns() // 1_000_000  # 客户端订单ID
         }
         
         # 签名请求
-        signed_request = self.user.sign_request("order", order_data)
+        signed_request = await asyncio.get_running_loop().run_in_executor(
+            self._sign_pool, self.user.sign_request, "order", order_data
+        )
+        
+        # 优先通过WebSocket交易通道发送，只有无法建立连接时才回退到HTTP
+        # 请求发出后的超时或断线不回退，避免同一订单被重复提交
+        if self.use_ws_trade_api:
+            try:
+                await self.ws_trade.connect()
+            except (OSError, websockets.WebSocketException):
+                pass
+            else:
+                return await self.ws_trade.send_and_wait(signed_request)
         
         # 发送请求
         return await self.connection.request("exchange", method="POST", data=signed_request) 
\ No newline at end of file
@@ -7,9 +7,44 @@
 """
 
 import time
+import heapq
 import logging
 from typing import Dict, List, Any, Optional, Tuple, Union
+from collections import defaultdict
 from datetime import datetime
+from types import MappingProxyType
+
+# 绑定到模块级名称，热路径中省去time模块属性查找
+_now = time.time
+
+# 日志级别名称到数值的映射
+_LEVEL_MAP = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+    "critical": logging.CRITICAL,
+}
+
+# 各种日志类型的默认最小记录间隔（秒），只读
+_DEFAULT_INTERVALS = MappingProxyType({
+    "default": 60,         # 默认限制：60秒
+    "price_update": 300,   # 价格更新：5分钟
+    "connection": 60,      # 连接日志：1分钟
+    "api_call": 60,        # API调用：1分钟
+    "heartbeat": 300,      # 心跳消息：5分钟
+    "websocket": 120,      # WebSocket消息：2分钟
+})
+
+
+def _price_change_abs(item: Tuple) -> float:
+    """价格变化摘要的排序键：变化百分比的绝对值"""
+    return abs(item[3])
+
+
+def _funding_rate_abs(item: Tuple[Tuple[str, str], Tuple[float, float]]) -> float:
+    """资金费率摘要的排序键：费率的绝对值"""
+    return abs(item[1][0])
 
 
 class RateLimitedLogger:
@@ -23,14 +58,10 @@ class RateLimitedLogger:
             min_interval_seconds: 各种日志类型的最小记录间隔（秒），格式为{类型: 间隔}
         """
         self.last_log_times = {}  # 存储每种类型的上次记录时间
-        self.min_intervals = min_interval_seconds or {
-            "default": 60,         # 默认限制：60秒
-            "price_update": 300,   # 价格更新：5分钟
-            "connection": 60,      # 连接日志：1分钟
-            "api_call": 60,        # API调用：1分钟
-            "heartbeat": 300,      # 心跳消息：5分钟
-            "websocket": 120,      # WebSocket消息：2分钟
-        }
+        # 未传入配置时共用模块级的只读默认间隔
+        self.min_intervals = dict(min_interval_seconds) if min_interval_seconds else _DEFAULT_INTERVALS
+        # 未单独配置的日志类型使用的间隔，配置中没有default时取60秒
+        self._default_interval = self.min_intervals.get("default", 60)
     
     def should_log(self, log_type: str) -> bool:
         """
@@ -42,12 +73,12 @@ class RateLimitedLogger:
         Returns:
             如果应该记录返回True，否则返回False
         """
-        now = time.time()
-        last_time = self.last_log_times.get(log_type, 0)
-        interval = self.min_intervals.get(log_type, self.min_intervals["default"])
+        last_log_times = self.last_log_times
+        now = _now()
+        interval = self.min_intervals.get(log_type, self._default_interval)
         
-        if now - last_time >= interval:
-            self.last_log_times[log_type] = now
+        if now - last_log_times.get(log_type, 0) >= interval:
+            last_log_times[log_type] = now
             return True
         return False
     
@@ -62,8 +93,13 @@ class RateLimitedLogger:
             message: 日志消息
             *args, **kwargs: 传递给日志方法的参数
         """
+        level_name = level.lower()
+        # 级别未启用时直接返回，不占用该类型的频率限制时间窗口
+        if not logger.isEnabledFor(_LEVEL_MAP[level_name]):
+            return
+        
         if self.should_log(log_type):
-            log_method = getattr(logger, level.lower())
+            log_method = getattr(logger, level_name)
             log_method(message, *args, **kwargs)
 
 
@@ -83,10 +119,10 @@ class LogSummarizer:
         self.last_summary_time = time.time()
         
         # 收集各种事件的临时存储
-        self.price_updates = {}  # {symbol: [(old_price, new_price, timestamp), ...]}
-        self.funding_updates = {}  # {symbol: (rate, timestamp)}
+        self.price_updates = {}  # {(exchange, symbol): (first_price, last_price, update_count, first_timestamp)}
+        self.funding_updates = {}  # {(exchange, symbol): (rate, timestamp)}
         self.api_calls = {"success": 0, "failed": 0}
-        self.errors = {}  # {error_type: count}
+        self.errors = defaultdict(int)  # {error_type: count}
         self.connection_events = {"connect": 0, "disconnect": 0}
     
     def record_price_update(self, symbol: str, exchange: str, old_price: float, new_price: float) -> None:
@@ -99,12 +135,15 @@ class LogSummarizer:
             old_price: 旧价格
             new_price: 新价格
         """
-        key = f"{exchange}_{symbol}"
-        if key not in self.price_updates:
-            self.price_updates[key] = []
-        
-        self.price_updates[key].append((old_price, new_price, time.time()))
-        self._check_summary()
+        now = _now()
+        # 每个交易对只保留首个价格、最新价格和更新次数，内存占用不随事件数增长
+        key = (exchange, symbol)
+        prev = self.price_updates.get(key)
+        if prev is None:
+            self.price_updates[key] = (old_price, new_price, 1, now)
+        else:
+            self.price_updates[key] = (prev[0], new_price, prev[2] + 1, prev[3])
+        self._check_summary(now)
     
     def record_funding_update(self, symbol: str, exchange: str, rate: float) -> None:
         """
@@ -115,9 +154,9 @@ class LogSummarizer:
             exchange: 交易所名称
             rate: 资金费率
         """
-        key = f"{exchange}_{symbol}"
-        self.funding_updates[key] = (rate, time.time())
-        self._check_summary()
+        now = _now()
+        self.funding_updates[(exchange, symbol)] = (rate, now)
+        self._check_summary(now)
     
     def record_api_call(self, success: bool = True) -> None:
         """
@@ -139,9 +178,6 @@ class LogSummarizer:
         Args:
             error_type: 错误类型
         """
-        if error_type not in self.errors:
-            self.errors[error_type] = 0
-        
         self.errors[error_type] += 1
         self._check_summary()
     
@@ -156,28 +192,38 @@ class LogSummarizer:
             self.connection_events[event_type] += 1
         self._check_summary()
     
-    def _check_summary(self) -> None:
-        """检查是否应该生成摘要"""
-        now = time.time()
+    def _check_summary(self, now: Optional[float] = None) -> None:
+        """
+        检查是否应该生成摘要
+        
+        Args:
+            now: 调用方已获取的当前时间戳，为None时重新获取
+        """
+        if now is None:
+            now = _now()
         if now - self.last_summary_time >= self.interval:
             self._generate_summary()
             self.last_summary_time = now
     
     def _generate_summary(self) -> None:
         """生成并记录摘要日志"""
+        # 空闲期间没有任何记录时直接返回
+        api_calls = self.api_calls
+        connection_events = self.connection_events
+        if not (self.price_updates or self.funding_updates or self.errors
+                or api_calls["success"] or api_calls["failed"]
+                or connection_events["connect"] or connection_events["disconnect"]):
+            return
+        
+        # 对应级别未启用时跳过排序和文本格式化，只清空计数
+        info_enabled = self.logger.isEnabledFor(logging.INFO)
+        warn_enabled = self.logger.isEnabledFor(logging.WARNING)
+        
         # 处理价格更新摘要
-        if self.price_updates:
+        if info_enabled and self.price_updates:
             significant_updates = []
-            for key, updates in self.price_updates.items():
-                if not updates:
-                    continue
-                    
-                exchange, symbol = key.split("_")
-                first_update = updates[0]
-                last_update = updates[-1]
-                first_price = first_update[0] or 0  # 处理None值
-                last_price = last_update[1]
-                update_count = len(updates)
+            for key, (first_price, last_price, update_count, _) in self.price_updates.items():
+                first_price = first_price or 0  # 处理None值
                 
                 # 计算价格变化百分比
                 if first_price > 0:
@@ -186,15 +232,14 @@ class LogSummarizer:
                     if abs(change_pct) > 0.5 or update_count > 10:  # 变化超过0.5%或者更新次数多
                         significant_updates.append((key, first_price, last_price, change_pct, update_count))
             
-            # 按变化幅度排序，显示最显著的变化
-            significant_updates.sort(key=lambda x: abs(x[3]), reverse=True)
-            top_updates = significant_updates[:5]  # 最多显示5个显著变化
+            # 按变化幅度取最显著的变化，最多显示5个
+            top_updates = heapq.nlargest(5, significant_updates, key=_price_change_abs)
             
             if top_updates:
-                updates_text = []
-                for key, first, last, change, count in top_updates:
-                    exchange, symbol = key.split("_")
-                    updates_text.append(f"{exchange}/{symbol}: {first:.2f}→{last:.2f} ({change:+.2f}%, {count}次)")
+                updates_text = [
+                    f"{exchange}/{symbol}: {first:.2f}→{last:.2f} ({change:+.2f}%, {count}次)"
+                    for (exchange, symbol), first, last, change, count in top_updates
+                ]
                 
                 more_count = len(significant_updates) - len(top_updates)
                 more_text = f" 及其他{more_count}个交易对有变化" if more_count > 0 else ""
@@ -202,15 +247,9 @@ class LogSummarizer:
                 self.logger.info(f"价格显著变化: {', '.join(updates_text)}{more_text}")
         
         # 处理资金费率摘要
-        if self.funding_updates:
-            updates_text = []
-            sorted_items = sorted(self.funding_updates.items(), 
-                                key=lambda x: abs(x[1][0]), 
-                                reverse=True)[:5]  # 按费率绝对值排序
-            
-            for key, (rate, _) in sorted_items:
-                exchange, symbol = key.split("_")
-                updates_text.append(f"{exchange}/{symbol}: {rate:+.6f}")
+        if info_enabled and self.funding_updates:
+            sorted_items = heapq.nlargest(5, self.funding_updates.items(), key=_funding_rate_abs)  # 按费率绝对值取前5个
+            updates_text = [f"{exchange}/{symbol}: {rate:+.6f}" for (exchange, symbol), (rate, _) in sorted_items]
             
             more_count = len(self.funding_updates) - len(sorted_items)
             more_text = f" 及其他{more_count}个更新" if more_count > 0 else ""
@@ -219,21 +258,22 @@ class LogSummarizer:
         
         # 处理API调用摘要
         if self.api_calls["success"] > 0 or self.api_calls["failed"] > 0:
-            self.logger.info(f"API调用统计: 成功 {self.api_calls['success']}次, 失败 {self.api_calls['failed']}次")
+            if info_enabled:
+                self.logger.info(f"API调用统计: 成功 {self.api_calls['success']}次, 失败 {self.api_calls['failed']}次")
             self.api_calls = {"success": 0, "failed": 0}
         
         # 处理错误摘要
         if self.errors:
-            error_texts = []
-            for error_type, count in self.errors.items():
-                error_texts.append(f"{error_type}: {count}次")
-            
-            self.logger.warning(f"错误统计: {', '.join(error_texts)}")
-            self.errors = {}
+            if warn_enabled:
+                error_texts = [f"{error_type}: {count}次" for error_type, count in self.errors.items()]
+                
+                self.logger.warning(f"错误统计: {', '.join(error_texts)}")
+            self.errors = defaultdict(int)
         
         # 处理连接事件摘要
         if self.connection_events["connect"] > 0 or self.connection_events["disconnect"] > 0:
-            self.logger.info(f"连接事件统计: 连接 {self.connection_events['connect']}次, 断开 {self.connection_events['disconnect']}次")
+            if info_enabled:
+                self.logger.info(f"连接事件统计: 连接 {self.connection_events['connect']}次, 断开 {self.connection_events['disconnect']}次")
             self.connection_events = {"connect": 0, "disconnect": 0}
         
         # 清空收集的数据
@@ -20,6 +20,23 @@ from typing import Dict, List, Any, Optional
 # TRACE = 5
 # logging.addLevelName(TRACE, "TRACE")
 
+# 日志级别名称到数值的映射
+_LEVEL_MAP = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "CRITICAL": logging.CRITICAL,
+}
+
+# 根日志记录器是否已经配置过，只需配置一次
+_root_configured = False
+
+class NullHandler(logging.Handler):
+    """空处理器，添加到根日志记录器，防止其他地方添加控制台处理器"""
+    def emit(self, record):
+        pass
+
 def setup_logger(config: Dict[str, Any], name: str = "funding_arbitrage") -> logging.Logger:
     """
     设置日志记录器，支持日志轮转
@@ -43,7 +60,7 @@ def setup_logger(config: Dict[str, Any], name: str = "funding_arbitrage") -> log
     
     # 获取日志级别
     log_level_str = config.get("level", "INFO").upper()
-    log_level = getattr(logging, log_level_str, logging.INFO)
+    log_level = _LEVEL_MAP.get(log_level_str, logging.INFO)
     
     # 获取日志轮转配置
     max_bytes = config.get("max_file_size", 10 * 1024 * 1024)  # 默认10MB
@@ -58,23 +75,12 @@ def setup_logger(config: Dict[str, Any], name: str = "funding_arbitrage") -> log
     print(f"控制台日志输出: {'禁用' if disable_console else '启用'}", file=sys.__stdout__)
     print(f"日志轮转设置: 最大大小={max_bytes/1024/1024:.1f}MB, 备份数量={backup_count}", file=sys.__stdout__)
     
-    # 移除所有已有的处理器
-    # 获取根日志记录器并删除所有已有处理器
-    for logger_name in logging.root.manager.loggerDict:
-        logger_obj = logging.getLogger(logger_name)
-        # 移除所有处理器
-        for handler in logger_obj.handlers[:]:
-            logger_obj.removeHandler(handler)
-    
-    # 移除根日志记录器的所有处理器
-    root_logger = logging.getLogger()
-    for handler in root_logger.handlers[:]:
-        root_logger.removeHandler(handler)
-    
-    # 配置日志记录器
+    # 配置日志记录器，只清除本记录器已有的处理器，重复调用时不会重复添加
     logger = logging.getLogger(name)
     logger.setLevel(log_level)
-    logger.handlers = []  # 清除所有处理器
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+        handler.close()
     
     # 添加轮转文件处理器
     formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -91,16 +97,23 @@ def setup_logger(config: Dict[str, Any], name: str = "funding_arbitrage") -> log
     # 阻止日志传递到上层日志记录器
     logger.propagate = False
     
-    # 创建空处理器添加到根日志记录器，防止其他地方添加控制台处理器
-    class NullHandler(logging.Handler):
-        def emit(self, record):
-            pass
-    
-    root_handler = NullHandler()
-    root_logger.addHandler(root_handler)
-    
-    # 确保root_logger设置了级别
-    root_logger.setLevel(logging.WARNING)
+    # 格式中不使用文件名/行号/函数名和线程/进程信息，关闭这些字段的采集，
+    # 省去每条日志调用sys._getframe查找调用位置的开销
+    logging._srcfile = None
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    
+    # 根日志记录器只配置一次：移除已有处理器，换成空处理器
+    global _root_configured
+    if not _root_configured:
+        _root_configured = True
+        root_logger = logging.getLogger()
+        root_logger.handlers.clear()
+        root_logger.addHandler(NullHandler())
+        
+        # 确保root_logger设置了级别
+        root_logger.setLevel(logging.WARNING)
     
     print(f"日志记录器设置完成，日志文件: {log_file}", file=sys.__stdout__)
     
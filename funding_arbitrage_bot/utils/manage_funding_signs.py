@@ -7,9 +7,9 @@
 """
 
 import os
-import json
 import argparse
-from typing import Dict, Optional, List
+import orjson
+from typing import Dict, Optional, List, Tuple
 
 class FundingSignsManager:
     """资金费率符号记录管理器"""
@@ -31,6 +31,10 @@ class FundingSignsManager:
         # 确保data目录存在
         os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
         
+        # 上次读取或写入时文件的(修改时间, 大小)及对应内容，文件未变化时直接复用
+        self._cached_stat: Optional[Tuple[int, int]] = None
+        self._cached_signs: Dict[str, int] = {}
+        
     def load_signs(self) -> Dict[str, int]:
         """
         加载资金费率符号记录
@@ -39,12 +43,21 @@ class FundingSignsManager:
             Dict[str, int]: 资金费率符号记录字典
         """
         try:
-            if os.path.exists(self.file_path):
-                with open(self.file_path, 'r') as f:
-                    signs_data = json.load(f)
-                    # 确保符号值是整数类型
-                    return {symbol: int(sign) for symbol, sign in signs_data.items()}
-            return {}
+            try:
+                st = os.stat(self.file_path)
+            except FileNotFoundError:
+                return {}
+            
+            file_stat = (st.st_mtime_ns, st.st_size)
+            if file_stat != self._cached_stat:
+                with open(self.file_path, 'rb') as f:
+                    signs_data = orjson.loads(f.read())
+                # 确保符号值是整数类型
+                self._cached_signs = {symbol: int(sign) for symbol, sign in signs_data.items()}
+                self._cached_stat = file_stat
+            
+            # 返回副本，调用方修改不会影响缓存
+            return dict(self._cached_signs)
         except Exception as e:
             print(f"加载资金费率符号记录文件失败: {e}")
             return {}
@@ -60,8 +73,12 @@ class FundingSignsManager:
             bool: 保存是否成功
         """
         try:
-            with open(self.file_path, 'w') as f:
-                json.dump(signs, f, indent=2)
+            with open(self.file_path, 'wb') as f:
+                f.write(orjson.dumps(signs, option=orjson.OPT_INDENT_2))
+            
+            st = os.stat(self.file_path)
+            self._cached_stat = (st.st_mtime_ns, st.st_size)
+            self._cached_signs = dict(signs)
             print(f"资金费率符号记录已保存到文件: {self.file_path}")
             return True
         except Exception as e:
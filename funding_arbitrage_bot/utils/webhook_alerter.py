@@ -2,10 +2,14 @@
 WebhookAlerter - 用于通过Webhook发送资金费率套利机器人的交易通知
 """
 
-import json
+import time
+import asyncio
 import logging
+import orjson
 import requests
-from typing import Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, Optional, Tuple
 
 class WebhookAlerter:
     """
@@ -22,6 +26,28 @@ class WebhookAlerter:
         self.webhook_url = webhook_url
         self.logger = logging.getLogger('funding_arbitrage')
         
+        # 复用同一个会话，保持TCP/TLS连接，避免每次通知都重新握手
+        # 只重试连接阶段的错误：读超时或错误状态码时服务端可能已收到请求，重发会产生重复通知
+        self._session = requests.Session()
+        self._session.headers.update({"Content-Type": "application/json"})
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=4,
+            max_retries=Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.2, allowed_methods=None)
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        
+        # 异步通知队列，时间窗口内的多条通知合并为一次请求
+        self.batch_window = 0.5  # 合并时间窗口(秒)
+        self._queue = None
+        self._flush_task = None
+        
+        # 重复通知抑制：相同(标题, 内容)在dedup_ttl秒内只发送一次
+        self.dedup_ttl = 900
+        self._recent: Dict[Tuple[str, str], float] = {}  # (标题, 内容) -> 过期时间
+        self._dedup_calls = 0
+        
     def send_notification(self, title: str, message: str, data: Dict[str, Any] = None) -> bool:
         """
         发送通知消息
@@ -36,25 +62,75 @@ class WebhookAlerter:
         """
         if not self.webhook_url:
             return False
+        if self._is_duplicate(title, message):
+            return True
+        return self._post(self._build_payload(title, message, data))
+    
+    def _is_duplicate(self, title: str, message: str) -> bool:
+        """
+        检查通知是否在抑制期内已经发送过，未发送过则记录
+        
+        Args:
+            title: 通知标题
+            message: 通知内容
             
-        try:
-            payload = {
-                "title": title,
-                "message": message
-            }
+        Returns:
+            bool: 是否为重复通知
+        """
+        now = time.time()
+        key = (title, message)
+        expires = self._recent.get(key)
+        if expires is not None and now < expires:
+            self.logger.debug(f"抑制重复通知: {title}")
+            return True
+        
+        self._recent[key] = now + self.dedup_ttl
+        
+        # 定期清理过期记录，避免字典无限增长
+        self._dedup_calls += 1
+        if self._dedup_calls >= 100 or len(self._recent) > 1024:
+            self._dedup_calls = 0
+            self._recent = {k: exp for k, exp in self._recent.items() if exp > now}
+        return False
+    
+    @staticmethod
+    def _build_payload(title: str, message: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        构建单条通知的请求体
+        
+        Args:
+            title: 通知标题
+            message: 通知内容
+            data: 附加数据（可选）
             
-            if data:
-                payload["data"] = data
-                
-            response = requests.post(
-                self.webhook_url,
-                json=payload,
-                headers={"Content-Type": "application/json"},
-                timeout=10
-            )
+        Returns:
+            请求体字典
+        """
+        payload = {
+            "title": title,
+            "message": message
+        }
+        
+        if data:
+            payload["data"] = data
+        return payload
+    
+    def _post(self, payload: Dict[str, Any]) -> bool:
+        """
+        将请求体POST到Webhook
+        
+        Args:
+            payload: 请求体
+            
+        Returns:
+            bool: 发送是否成功
+        """
+        try:
+            # 用orjson一次性序列化为bytes，会话已设置JSON的Content-Type
+            response = self._session.post(self.webhook_url, data=orjson.dumps(payload, default=str), timeout=10)
             
             if response.status_code >= 200 and response.status_code < 300:
-                self.logger.debug(f"通知发送成功: {title}")
+                self.logger.debug(f"通知发送成功: {payload['title']}")
                 return True
             else:
                 self.logger.warning(f"通知发送失败，状态码: {response.status_code}, 响应: {response.text}")
@@ -64,21 +140,88 @@ class WebhookAlerter:
             self.logger.error(f"发送通知时出错: {str(e)}")
             return False
             
-    def send_order_notification(self, symbol: str, action: str, quantity: float, 
-                               price: float, side: str, exchange: str) -> bool:
+    async def send_notification_async(self, title: str, message: str, data: Dict[str, Any] = None) -> bool:
         """
-        发送订单通知
+        异步发送通知消息
+        
+        消息先放入队列，由后台任务把batch_window时间窗口内的消息合并为一次请求发送，
+        HTTP请求在线程中执行，不阻塞事件循环
         
         Args:
-            symbol: 交易对
-            action: 动作 (开仓/平仓)
-            quantity: 数量
-            price: 价格
-            side: 方向 (多/空)
-            exchange: 交易所
+            title: 通知标题
+            message: 通知内容
+            data: 附加数据（可选）
             
         Returns:
-            bool: 发送是否成功
+            bool: 是否已加入发送队列
+        """
+        if not self.webhook_url:
+            return False
+        if self._is_duplicate(title, message):
+            return True
+        
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        
+        self._queue.put_nowait(self._build_payload(title, message, data))
+        return True
+    
+    async def _flush_loop(self):
+        """后台发送任务：等待第一条消息，收集时间窗口内的后续消息后一次性发送"""
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.batch_window
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            if len(batch) == 1:
+                payload = batch[0]
+            else:
+                payload = {
+                    "title": f"{len(batch)}条通知",
+                    "message": "\n".join(item["message"] for item in batch),
+                    "messages": batch
+                }
+            
+            try:
+                await asyncio.to_thread(self._post, payload)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+    
+    async def close(self):
+        """发送队列中剩余的通知，然后停止后台任务并关闭HTTP会话"""
+        if self._flush_task is not None and not self._flush_task.done():
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=10)
+            except asyncio.TimeoutError:
+                self.logger.warning("等待剩余通知发送超时")
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        self._flush_task = None
+        self._session.close()
+    
+    @staticmethod
+    def _order_notification(symbol: str, action: str, quantity: float,
+                            price: float, side: str, exchange: str) -> Tuple[str, str, Dict[str, Any]]:
+        """
+        构建订单通知内容
+        
+        Returns:
+            (通知标题, 通知内容, 附加数据)
         """
         title = f"{action}通知 - {symbol}"
         message = f"{exchange}交易所{action}{side}单: {quantity} {symbol} @ {price}"
@@ -91,8 +234,47 @@ class WebhookAlerter:
             "side": side,
             "exchange": exchange
         }
+        return title, message, data
+    
+    def send_order_notification(self, symbol: str, action: str, quantity: float, 
+                               price: float, side: str, exchange: str) -> bool:
+        """
+        发送订单通知
+        
+        Args:
+            symbol: 交易对
+            action: 动作 (开仓/平仓)
+            quantity: 数量
+            price: 价格
+            side: 方向 (多/空)
+            exchange: 交易所
+            
+        Returns:
+            bool: 发送是否成功
+        """
+        return self.send_notification(
+            *self._order_notification(symbol, action, quantity, price, side, exchange)
+        )
+    
+    async def send_order_notification_async(self, symbol: str, action: str, quantity: float,
+                                            price: float, side: str, exchange: str) -> bool:
+        """
+        异步发送订单通知，供事件循环中的交易流程调用
         
-        return self.send_notification(title, message, data)
+        Args:
+            symbol: 交易对
+            action: 动作 (开仓/平仓)
+            quantity: 数量
+            price: 价格
+            side: 方向 (多/空)
+            exchange: 交易所
+            
+        Returns:
+            bool: 发送是否成功
+        """
+        return await self.send_notification_async(
+            *self._order_notification(symbol, action, quantity, price, side, exchange)
+        )
         
     def send_funding_notification(self, symbol: str, funding_rate: float, 
                                  funding_diff: float, exchanges: list) -> bool:
@@ -4,78 +4,22 @@
 资金费率套利机器人主运行文件
 """
 
-import os
-import sys
 import asyncio
-import logging
-import yaml
-from logging.handlers import RotatingFileHandler
 from datetime import datetime
 
 from funding_arbitrage_bot.strategies.funding_arbitrage import FundingArbitrageStrategy
-
-
-def setup_logging(config):
-    """设置日志系统"""
-    # 获取日志配置
-    log_config = config.get("logging", {})
-    log_level_str = log_config.get("level", "INFO")
-    log_file = log_config.get("file", "arbitrage.log")
-    max_size_mb = log_config.get("max_size_mb", 10)
-    backup_count = log_config.get("backup_count", 5)
-    
-    # 转换日志级别字符串到日志级别
-    log_level = getattr(logging, log_level_str.upper(), logging.INFO)
-    
-    # 创建日志格式
-    log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    formatter = logging.Formatter(log_format)
-    
-    # 创建根日志记录器
-    root_logger = logging.getLogger()
-    root_logger.setLevel(log_level)
-    
-    # 清除现有处理器
-    for handler in root_logger.handlers[:]:
-        root_logger.removeHandler(handler)
-    
-    # 创建控制台处理器
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
-    
-    # 创建文件处理器 (如果配置了日志文件)
-    if log_file:
-        # 确保日志目录存在
-        log_dir = os.path.dirname(log_file)
-        if log_dir and not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-            
-        # 使用RotatingFileHandler以便轮转日志
-        file_handler = RotatingFileHandler(
-            log_file,
-            maxBytes=max_size_mb * 1024 * 1024,
-            backupCount=backup_count
-        )
-        file_handler.setFormatter(formatter)
-        root_logger.addHandler(file_handler)
-    
-    # 记录日志配置信息
-    root_logger.info(f"日志级别设置为: {log_level_str}")
-    root_logger.info(f"日志文件: {log_file}")
-    
-    return root_logger
+from funding_arbitrage_bot.utils.helpers import load_config
+from funding_arbitrage_bot.utils.logger import setup_logger
 
 
 async def main():
     """主函数"""
     # 加载配置
     config_path = "funding_arbitrage_bot/config.yaml"
-    with open(config_path, "r") as file:
-        config = yaml.safe_load(file)
+    config = load_config(config_path)
     
     # 设置日志系统
-    logger = setup_logging(config)
+    logger = setup_logger(config.get("logging", {}))
     logger.info("启动资金费率套利程序...")
     
     # 记录启动详情